@@ -0,0 +1,85 @@
+import nxneo4j
+
+
+def bench_pagerank_dict(benchmark, graph):
+    benchmark(nxneo4j.pagerank, graph)
+
+
+def bench_pagerank_numpy(benchmark, graph):
+    benchmark(nxneo4j.pagerank, graph, output="numpy")
+
+
+def bench_pagerank_dict_records(benchmark, record_graph):
+    benchmark(nxneo4j.pagerank, record_graph)
+
+
+def bench_pagerank_numpy_records(benchmark, record_graph):
+    benchmark(nxneo4j.pagerank, record_graph, output="numpy")
+
+
+def bench_betweenness_centrality(benchmark, graph):
+    benchmark(nxneo4j.betweenness_centrality, graph)
+
+
+def bench_triangles(benchmark, graph):
+    benchmark(nxneo4j.triangles, graph)
+
+
+def bench_label_propagation_sets(benchmark, graph):
+    benchmark(lambda: list(nxneo4j.label_propagation_communities(graph)))
+
+
+def bench_label_propagation_numpy(benchmark, graph):
+    benchmark(nxneo4j.label_propagation_communities, graph, output="numpy")
+
+
+def bench_single_source_shortest_path(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in nxneo4j.shortest_path(graph, 0)))
+
+
+def bench_single_source_dijkstra_path(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in nxneo4j.shortest_path(graph, 0, weight="weight")))
+
+
+def bench_triangles_nodes(benchmark, graph):
+    benchmark(nxneo4j.triangles, graph, nodes=[0, 1, 2])
+
+
+def bench_closeness_centrality_node(benchmark, graph):
+    benchmark(nxneo4j.closeness_centrality, graph, 0)
+
+
+def bench_betweenness_centrality_sampled(benchmark, graph):
+    benchmark(nxneo4j.betweenness_centrality, graph, k=100)
+
+
+def bench_personalized_pagerank_batch(benchmark, graph):
+    benchmark(nxneo4j.personalized_pagerank, graph, [[i] for i in range(10)])
+
+
+def bench_pagerank_write(benchmark, graph):
+    benchmark(nxneo4j.pagerank, graph, write_property="pagerank")
+
+
+def bench_connected_components_pairs(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in nxneo4j.connected_components(graph, output="pairs")))
+
+
+def bench_number_connected_components(benchmark, graph):
+    benchmark(nxneo4j.number_connected_components, graph)
+
+
+def bench_pagerank_local(benchmark, graph):
+    benchmark(nxneo4j.pagerank, graph, backend="local")
+
+
+def bench_betweenness_centrality_local(benchmark, graph):
+    benchmark(nxneo4j.betweenness_centrality, graph, k=100, backend="local")
+
+
+def bench_triangles_local(benchmark, graph):
+    benchmark(nxneo4j.triangles, graph, backend="local")
+
+
+def bench_connected_components_local(benchmark, graph):
+    benchmark(nxneo4j.number_connected_components, graph, backend="local")
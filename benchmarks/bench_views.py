@@ -0,0 +1,80 @@
+import nxneo4j
+from benchmarks.conftest import config
+
+
+def bench_iterate_nodes(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in graph.nodes))
+
+
+def bench_iterate_nodes_data(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in graph.nodes(data=True)))
+
+
+def bench_iterate_edges(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in graph.edges))
+
+
+def bench_len(benchmark, graph):
+    benchmark(len, graph)
+
+
+def bench_len_edges(benchmark, graph):
+    benchmark(len, graph.edges)
+
+
+def bench_contains(benchmark, graph, scale):
+    benchmark(lambda: (scale // 2) in graph)
+
+
+def bench_node_attributes(benchmark, graph, scale):
+    benchmark(lambda: graph.nodes[scale // 2])
+
+
+def bench_contains_cached(benchmark, graph, scale):
+    G = nxneo4j.Graph(graph.driver, dict(config, cache_size=1024))
+    benchmark(lambda: (scale // 2) in G)
+
+
+def bench_len_cached(benchmark, graph):
+    G = nxneo4j.Graph(graph.driver, dict(config, cache_size=1024))
+    benchmark(len, G)
+
+
+def bench_len_instrumented(benchmark, graph):
+    operations = []
+    graph.instrument(operations.append)
+    try:
+        benchmark(len, graph)
+    finally:
+        graph.uninstrument(operations.append)
+
+
+def bench_degree(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in graph.degree))
+
+
+def bench_adjacency(benchmark, graph):
+    benchmark(lambda: sum(1 for _ in graph.adj.items()))
+
+
+def bench_neighbors_of(benchmark, graph, scale):
+    nbunch = range(0, scale, max(1, scale // 1000))
+    benchmark(graph.neighbors_of, nbunch)
+
+
+def bench_snapshot(benchmark, graph):
+    benchmark(graph.snapshot)
+
+
+def bench_snapshot_neighbors(benchmark, graph, scale):
+    snapshot = graph.snapshot()
+    nbunch = range(0, scale, max(1, scale // 1000))
+    benchmark(snapshot.neighbors_of, nbunch)
+
+
+def bench_to_networkx(benchmark, graph):
+    benchmark(nxneo4j.to_networkx, graph)
+
+
+def bench_to_networkx_projected(benchmark, graph):
+    benchmark(nxneo4j.to_networkx, graph, node_attributes=False, edge_attributes=["weight"])
@@ -0,0 +1,77 @@
+from benchmarks.conftest import BATCH_SIZE, edges, empty_graph
+
+
+def bench_add_nodes_from(benchmark, scale):
+    def load(G):
+        G.add_nodes_from(range(scale), batch_size=BATCH_SIZE)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(), ), {}), rounds=3)
+
+
+def bench_add_nodes_from_with_attributes(benchmark, scale):
+    def load(G):
+        G.add_nodes_from(((i, {"weight": i % 10}) for i in range(scale)), batch_size=BATCH_SIZE)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(), ), {}), rounds=3)
+
+
+def bench_add_edges_from(benchmark, scale):
+    def load(G):
+        G.add_edges_from(edges(scale), batch_size=BATCH_SIZE)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(), ), {}), rounds=3)
+
+
+# Seconds every query of the load benchmarks waits for the "server"; the
+# stand-in does all of its work under the GIL, so only the round trips of
+# concurrent sessions overlap.
+LATENCY = 0.005
+
+
+def bench_add_edges_from_latency(benchmark, scale):
+    def load(G):
+        G.add_edges_from(edges(scale), batch_size=scale // 100)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(LATENCY), ), {}), rounds=3)
+
+
+def bench_load_edges_latency(benchmark, scale):
+    def load(G):
+        G.load_edges(edges(scale), workers=4, batch_size=scale // 100)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(LATENCY), ), {}), rounds=3)
+
+
+def bench_add_edges_from_id_cache(benchmark, scale):
+    def load(G):
+        G.add_edges_from(edges(scale), batch_size=BATCH_SIZE)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(id_cache_size=scale), ), {}), rounds=3)
+
+
+def bench_from_networkx(benchmark, scale):
+    import networkx as nx
+    import nxneo4j
+
+    H = nx.Graph()
+    H.add_nodes_from(((i, {"weight": i % 10}) for i in range(scale)))
+    H.add_edges_from(edges(scale))
+
+    def load(G):
+        nxneo4j.from_networkx(H, G, batch_size=BATCH_SIZE)
+    benchmark.pedantic(load, setup=lambda: ((empty_graph(), ), {}), rounds=3)
+
+
+def bench_sync(benchmark, scale):
+    import networkx as nx
+    import nxneo4j
+
+    H = nx.Graph()
+    H.add_nodes_from(((i, {"weight": i % 10}) for i in range(scale)))
+    H.add_edges_from(edges(scale))
+    changed = H.copy()
+    for i in range(0, scale, 100):
+        changed.nodes[i]["weight"] = -1
+
+    def setup():
+        G = empty_graph()
+        nxneo4j.from_networkx(H, G, batch_size=BATCH_SIZE)
+        return (G, ), {}
+
+    def sync(G):
+        G.sync(changed, batch_size=BATCH_SIZE)
+    benchmark.pedantic(sync, setup=setup, rounds=3)
@@ -0,0 +1,72 @@
+import gc
+import os
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+import nxneo4j
+from benchmarks.standin import StandInDriver
+
+# Graph sizes to benchmark, e.g. NXNEO4J_BENCH_SCALES=10000,1000000,10000000.
+# The stand-in keeps the whole graph in Python objects, 10M nodes need
+# several GB of memory.
+SCALES = [int(n) for n in os.environ.get("NXNEO4J_BENCH_SCALES", "10000").split(",")]
+
+BATCH_SIZE = 10000
+
+# Runs compared with a baseline fail when a mean regresses by more than
+# this. Between runs on one machine the means of the stand-in benchmarks
+# vary by up to ~130%, so only larger regressions are reported.
+COMPARE_FAIL = "mean:200%"
+
+config = {
+    "node_label": "Node",
+    "relationship_type": "CONNECTED",
+    "identifier_property": "id"
+}
+
+_loaded = {}
+
+
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options.
+    if config.getoption("benchmark_compare") and not config.getoption("benchmark_compare_fail"):
+        config.option.benchmark_compare_fail = [parse_compare_fail(COMPARE_FAIL)]
+
+
+def empty_graph(latency=0, records=False, **options):
+    G = nxneo4j.Graph(StandInDriver(config, latency, records), dict(config, **options))
+    G.ensure_schema()
+    return G
+
+
+def edges(scale):
+    return ((i, (i * 7919 + 1) % scale) for i in range(scale))
+
+
+@pytest.fixture(params=SCALES, ids=lambda n: "n=%d" % n)
+def scale(request):
+    return request.param
+
+
+def loaded_graph(scale, records=False):
+    # Loaded graphs are shared by all read benchmarks of the same scale.
+    if (scale, records) not in _loaded:
+        G = empty_graph(records=records)
+        G.add_nodes_from(((i, {"weight": i % 10}) for i in range(scale)), batch_size=BATCH_SIZE)
+        G.add_edges_from(edges(scale), batch_size=BATCH_SIZE)
+        _loaded[scale, records] = G
+        # The stand-in holds the graph a server would in this process; moved
+        # out of the collected generations, it isn't traversed by every full
+        # collection the code under test triggers.
+        gc.freeze()
+    return _loaded[scale, records]
+
+
+@pytest.fixture
+def graph(scale):
+    return loaded_graph(scale)
+
+
+@pytest.fixture
+def record_graph(scale):
+    # The same graph with its rows handed out as driver Records.
+    return loaded_graph(scale, records=True)
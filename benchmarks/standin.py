@@ -0,0 +1,739 @@
+"""
+In-process stand-in for a Neo4j driver.
+
+It implements the Cypher statements and ``algo.*`` procedure calls issued by
+``nxneo4j.base_graph`` against an in-memory graph, so that the client side
+overhead of nxneo4j can be measured without a server. Statements are matched
+by their exact text, formatted with the configuration of the graph; anything
+else raises NotImplementedError, which keeps the stand-in honest when queries
+change.
+
+Algorithm procedures don't run the algorithm: they stream synthetic,
+deterministic rows in the shape the real procedure yields, which is what the
+decoding benchmarks need.
+"""
+import heapq
+import itertools
+import re
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from neo4j import Record
+from neo4j.exceptions import ConfigurationError, CypherTypeError
+
+from nxneo4j import convert
+from nxneo4j.base_graph import BaseGraph, NodeView, EdgeView, AdjacencyView, DegreeView, _ARROWS, _REVERSE
+from nxneo4j.batch import WriteBatch
+
+
+# The session config keys of the current driver that nxneo4j passes.
+_SESSION_CONFIG = {"default_access_mode", "fetch_size", "database", "bookmarks"}
+
+
+class Counters:
+    def __init__(self, **counters):
+        self.nodes_created = counters.get("nodes_created", 0)
+        self.nodes_deleted = counters.get("nodes_deleted", 0)
+        self.relationships_created = counters.get("relationships_created", 0)
+        self.relationships_deleted = counters.get("relationships_deleted", 0)
+        self.properties_set = counters.get("properties_set", 0)
+
+
+class Summary:
+    def __init__(self, counters):
+        self.counters = counters
+        self.result_available_after = 0
+        self.result_consumed_after = 0
+        self.profile = None
+        self.plan = None
+
+
+class Result:
+    def __init__(self, records, counters=None):
+        self._records = iter(records)
+        self._peeked = []
+        self._summary = Summary(counters or Counters())
+
+    def __iter__(self):
+        while self._peeked:
+            yield self._peeked.pop(0)
+        for record in self._records:
+            yield record
+
+    def records(self):
+        return iter(self)
+
+    def peek(self):
+        if not self._peeked:
+            self._peeked.append(next(self._records, None))
+        return self._peeked[0]
+
+    def single(self):
+        return next(iter(self), None)
+
+    def keys(self):
+        if not self._peeked:
+            record = next(self._records, None)
+            if record is None:
+                return []
+            self._peeked.append(record)
+        return list(self._peeked[0].keys())
+
+    def values(self, *keys):
+        if keys:
+            return [[r[k] for k in keys] for r in self]
+        return [r.values() for r in self]
+
+    def hydrate(self):
+        self._records = (Record(r.items()) for r in self._records)
+
+    def consume(self):
+        for _ in self:
+            pass
+        return self._summary
+
+    def summary(self):
+        return self._summary
+
+
+class Transaction:
+    def __init__(self, session):
+        self.session = session
+
+    def run(self, query, parameters=None, **kwparameters):
+        return self.session.run(query, parameters, **kwparameters)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def run(self, query, parameters=None, **kwparameters):
+        params = dict(parameters or {})
+        params.update(kwparameters)
+        return self.driver.execute(query, params)
+
+    def begin_transaction(self):
+        return Transaction(self)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(Transaction(self), *args, **kwargs)
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(Transaction(self), *args, **kwargs)
+
+
+class StandInDriver:
+    # `latency` is slept before every query, the round trip to a server that
+    # concurrent sessions can overlap. With `records` the rows are handed out
+    # as driver Records instead of dicts, so reading their fields costs what
+    # it does with a server.
+    def __init__(self, config=None, latency=0, records=False):
+        config = config or {}
+        self.latency = latency
+        self.records = records
+        self.label = config.get("node_label", "Node")
+        self.relationship_type = config.get("relationship_type", "CONNECTED")
+        self.key = config.get("identifier_property", "id")
+
+        self.nodes = {}
+        self.node_ids = {}
+        self._node_ids = itertools.count()
+        self.edges = {}
+        self.out = defaultdict(set)
+        self.inc = defaultdict(set)
+        self.indexed = False
+        self.version = 0
+        self._edge_ids = itertools.count()
+        self._algorithm_rows = {}
+        self.handlers = self._handlers()
+        self.patterns = self._patterns()
+
+    def session(self, **config):
+        # Like the installed driver, unknown config keys are rejected.
+        unexpected = set(config) - _SESSION_CONFIG
+        if unexpected:
+            raise ConfigurationError("Unexpected config keys: %s" % ", ".join(sorted(unexpected)))
+        return Session(self)
+
+    def close(self):
+        pass
+
+    def execute(self, query, params):
+        profile = query.startswith("PROFILE ")
+        if profile:
+            query = query[len("PROFILE "):]
+        handler = self.handlers.get(query)
+        if handler is None:
+            handler = self._match(query)
+        if self.latency:
+            time.sleep(self.latency)
+        result = handler(params)
+        if self.records:
+            result.hydrate()
+        if profile:
+            result._summary.profile = {"operatorType": "ProduceResults", "dbHits": 0, "rows": 0, "children": []}
+        return result
+
+    def _handlers(self):
+        label, rel, key = self.label, self.relationship_type, self.key
+        handlers = {
+            NodeView.number_of_nodes_query % label: self._count_nodes,
+            NodeView.get_node_attributes_query % (label, key): self._get_node,
+            NodeView.has_node_query % (label, key): self._has_node,
+            NodeView.get_nodes_query % label: self._get_nodes,
+            NodeView.get_nodes_first_page_query % (label, key): self._get_nodes_page,
+            NodeView.get_nodes_next_page_query % (label, key, key): self._get_nodes_page,
+            EdgeView.number_of_edges_query % (label, rel, label): self._count_edges,
+            EdgeView.get_edges_query % (label, rel, label, key, key): self._get_edges,
+            EdgeView.get_edges_first_page_query % (label, key, key, rel, label, key, key): self._get_edges_page,
+            EdgeView.get_edges_next_page_query % (label, key, key, rel, label, key, key): self._get_edges_page,
+            EdgeView.get_edges_of_page_query % (label, key, rel, label, key, key): self._get_node_edges_page,
+            BaseGraph.indexes_query: self._indexes,
+            BaseGraph.last_committed_tx_query: self._last_committed_tx,
+            BaseGraph.create_constraint_query % (label, key): self._create_index,
+            BaseGraph.create_index_query % (label, key): self._create_index,
+            BaseGraph.add_node_query % (label, key): self._add_node,
+            BaseGraph.add_node_query_with_props % (label, key): self._add_node,
+            BaseGraph.add_nodes_query % (label, key): self._add_nodes,
+            BaseGraph.add_nodes_query_with_attrdict % (label, key, key): self._add_nodes,
+            BaseGraph.add_edge_query % (label, key, label, key, rel): self._add_edge,
+            BaseGraph.add_nodes_ids_query % (label, key, key, key): self._add_nodes_ids,
+            BaseGraph.add_nodes_ids_query_without_props % (label, key): self._add_nodes_ids,
+            BaseGraph.add_edges_ids_query % (label, key, label, key, rel): self._add_edges_ids,
+            BaseGraph.add_edges_by_id_query % (label, key, label, key, rel): self._add_edges_by_id,
+            BaseGraph.add_edges_query % (label, key, label, key, rel): self._add_edges,
+            BaseGraph.remove_node_query % (label, key): self._remove_node,
+            BaseGraph.remove_nodes_query % (label, key): self._remove_nodes,
+            WriteBatch.remove_nodes_query % (label, key): self._remove_nodes,
+            BaseGraph.remove_edges_query % (label, key, rel, label, key): self._remove_edges,
+            BaseGraph.sync_nodes_query % (label, key, key): self._set_nodes,
+            BaseGraph.sync_edges_query % (label, key, rel, label, key): self._set_edges,
+            BaseGraph._clear_graph_edges_query % (label, rel, label): self._clear_edges,
+            BaseGraph._clear_graph_nodes_query % label: self._clear_nodes,
+            BaseGraph.snapshot_nodes_query % (label, key): self._snapshot_nodes,
+            BaseGraph.snapshot_edges_query % (label, rel, label): self._snapshot_edges,
+            BaseGraph.load_graph_query: self._load_graph,
+            BaseGraph.remove_graph_query: self._remove_graph,
+            BaseGraph.betweenness_centrality_query % key: self._scores("centrality"),
+            BaseGraph.betweenness_centrality_sampled_query % key: self._scores("centrality"),
+            BaseGraph.closeness_centrality_query % key: self._scores("centrality"),
+            BaseGraph.harmonic_centrality_query % key: self._scores("centrality"),
+            BaseGraph.pagerank_query % (label, key, key): self._scores("score"),
+            BaseGraph.personalized_pagerank_query % (label, key, key): self._personalized_scores,
+            BaseGraph.triangle_count_query % key: self._triangle_counts,
+            BaseGraph.triangle_query: self._average_clustering,
+            BaseGraph.distance_sums_query % (label, key): self._distance_sums,
+            BaseGraph.node_triangles_query % (label, key, rel, label, rel, label, rel, label, rel): self._node_triangles,
+            BaseGraph.betweenness_centrality_write_query: self._write_scores("centrality"),
+            BaseGraph.betweenness_centrality_sampled_write_query: self._write_scores("centrality"),
+            BaseGraph.closeness_centrality_write_query: self._write_scores("centrality"),
+            BaseGraph.pagerank_write_query % (label, key): self._write_scores("score"),
+            BaseGraph.triangle_count_write_query: self._write_triangles,
+            BaseGraph.lpa_write_query: self._write_scores("community", self._membership),
+            BaseGraph.connected_components_write_query: self._write_scores("community", self._membership),
+            BaseGraph.connected_component_sizes_query: self._component_sizes,
+            BaseGraph.number_connected_components_query: self._component_count,
+            BaseGraph.lpa_query % key: self._communities,
+            BaseGraph.connected_components_query % key: self._communities,
+            BaseGraph.lpa_membership_query % key: self._membership,
+            BaseGraph.connected_components_membership_query % key: self._membership,
+        }
+        for attributes in (True, False, ["weight"]):
+            handlers[convert.nodes_query % (label, key, convert._projection("node", attributes))] = self._export_nodes
+            handlers[convert.edges_query % (label, rel, label, key, key, convert._projection("edge", attributes))] = \
+                self._export_edges
+        graph = SimpleNamespace(node_label=label, relationship_type=rel, identifier_property=key)
+        for direction in ("BOTH", "OUTGOING", "INCOMING"):
+            adj = AdjacencyView(graph, direction)
+            handlers[adj._format(adj.adjacency_query)] = self._adjacency(direction, True)
+            handlers[adj._format(adj.neighbors_query)] = self._adjacency(direction, False)
+            handlers[adj._format(adj.get_adjacency_query)] = self._get_adjacency(direction)
+            left, right = _ARROWS[_REVERSE[direction]]
+            dijkstra_query = BaseGraph.single_source_dijkstra_query % (label, key, key, left, rel, right, label, key)
+            handlers[dijkstra_query] = self._dijkstra
+            for weight in (None, "weight"):
+                degree = DegreeView(graph, direction, weight)
+                handlers[degree._format(degree.degrees_query)] = self._degrees(direction)
+                handlers[degree._format(degree.get_degrees_query)] = self._get_degrees(direction)
+        return handlers
+
+    def _patterns(self):
+        # Statements on temporary properties, whose names are generated.
+        name = "\0"
+        patterns = [
+            (BaseGraph.drain_property_query % (self.label, name, name), self._drain_property),
+            (BaseGraph.move_property_query % (self.label, name, name, name, name), self._move_property),
+        ]
+        return [(re.compile(re.escape(query).replace(re.escape(name), "([^`]*)") + "$"), handler)
+                for query, handler in patterns]
+
+    def _match(self, query):
+        for pattern, handler in self.patterns:
+            match = pattern.match(query)
+            if match:
+                return lambda params: handler(params, *match.groups())
+        raise NotImplementedError("The stand-in driver doesn't implement:\n%s" % query)
+
+    # Reads
+
+    def _count_nodes(self, params):
+        return Result([{"numberOfNodes": len(self.nodes)}])
+
+    def _get_node(self, params):
+        node = self.nodes.get(params["value"])
+        return Result([] if node is None else [{"node": node}])
+
+    def _has_node(self, params):
+        return Result([{"exists": params["value"] in self.nodes}])
+
+    def _get_nodes(self, params):
+        return Result({"node": node} for node in self.nodes.values())
+
+    def _get_nodes_page(self, params):
+        after = params.get("after")
+        keys = sorted(k for k in self.nodes if after is None or k > after)
+        return Result({"node": self.nodes[k]} for k in keys[:params["limit"]])
+
+    def _snapshot_nodes(self, params):
+        # The position of a node stands in for its internal id.
+        return Result({"nodeId": i, "node": k} for i, k in enumerate(self.nodes))
+
+    def _snapshot_edges(self, params):
+        ids = {k: i for i, k in enumerate(self.nodes)}
+        weight = params["weight"]
+        return Result({"u": ids[u], "v": ids[v], "weight": d.get(weight, 1.0) if weight else 1.0}
+                      for (u, v), (_, d) in self.edges.items())
+
+    def _project(self, data, keys):
+        if keys is True:
+            return dict(data)
+        if not keys:
+            return None
+        return [[k, data.get(k)] for k in keys]
+
+    def _export_nodes(self, params):
+        return Result({"node": k, "data": self._project(d, params["keys"])} for k, d in self.nodes.items())
+
+    def _export_edges(self, params):
+        return Result({"u": u, "v": v, "data": self._project(d, params["keys"])}
+                      for (u, v), (_, d) in self.edges.items())
+
+    def _count_edges(self, params):
+        return Result([{"numberOfEdges": len(self.edges)}])
+
+    def _get_edges(self, params):
+        return Result({"u": u, "v": v, "edge": d} for (u, v), (_, d) in self.edges.items())
+
+    def _get_edges_page(self, params):
+        # Source nodes in order, their relationships in the order of the
+        # adjacency sets, like an expand on the server.
+        after = params.get("after")
+        rows = ({"u": u, "v": v, "edge": self.edges[(u, v)][1], "edgeId": self.edges[(u, v)][0]}
+                for u in sorted(self.nodes) if after is None or u > after
+                for v in self.out.get(u, ()))
+        return Result(itertools.islice(rows, params["limit"]))
+
+    def _get_node_edges_page(self, params):
+        u = params["after"]
+        rows = sorted((i, v, d) for v in self.out.get(u, ()) for i, d in [self.edges[(u, v)]]
+                      if i > params["afterEdge"])
+        return Result({"u": u, "v": v, "edge": d, "edgeId": i} for i, v, d in rows[:params["limit"]])
+
+    def _neighbors(self, u, direction):
+        if direction != "INCOMING":
+            for v in self.out.get(u, ()):
+                yield v, self.edges[(u, v)][1]
+        if direction != "OUTGOING":
+            for v in self.inc.get(u, ()):
+                yield v, self.edges[(v, u)][1]
+
+    def _adjacency(self, direction, data):
+        def handler(params):
+            return Result({
+                "value": u,
+                "neighbors": [[v, d] if data else v for v, d in self._neighbors(u, direction)]
+            } for u in params["values"] if u in self.nodes)
+        return handler
+
+    def _get_adjacency(self, direction):
+        def handler(params):
+            return Result({
+                "node": u,
+                "neighbors": [[v, d] for v, d in self._neighbors(u, direction)]
+            } for u in self.nodes)
+        return handler
+
+    def _degree(self, u, direction, weight):
+        if weight is None:
+            return sum(1 for _ in self._neighbors(u, direction))
+        return sum(d.get(weight, 1) for _, d in self._neighbors(u, direction))
+
+    def _degrees(self, direction):
+        def handler(params):
+            return Result({
+                "node": u,
+                "degree": self._degree(u, direction, params["weight"])
+            } for u in params["values"] if u in self.nodes)
+        return handler
+
+    def _get_degrees(self, direction):
+        def handler(params):
+            return Result({
+                "node": u,
+                "degree": self._degree(u, direction, params["weight"])
+            } for u in self.nodes)
+        return handler
+
+    def _indexes(self, params):
+        if not self.indexed:
+            return Result([])
+        return Result([{"tokenNames": [self.label], "properties": [self.key], "state": "ONLINE"}])
+
+    def _last_committed_tx(self, params):
+        return Result([{"lastCommittedTxId": self.version}])
+
+    def _create_index(self, params):
+        self.indexed = True
+        return Result([])
+
+    # Writes
+
+    def _merge_node(self, value, props=None):
+        node = self.nodes.get(value)
+        if node is not None:
+            return 0, 0
+        node = {self.key: value}
+        if props:
+            node.update(props)
+        self.nodes[value] = node
+        self.node_ids[value] = next(self._node_ids)
+        return 1, len(node)
+
+    def _merge_edge(self, u, v, props):
+        if (u, v) in self.edges:
+            return 0, 0
+        self.edges[(u, v)] = (next(self._edge_ids), dict(props or {}))
+        self.out[u].add(v)
+        self.inc[v].add(u)
+        return 1, len(props or {})
+
+    def _add_node(self, params):
+        created, props_set = self._merge_node(params["value"], params.get("props"))
+        self.version += 1
+        return Result([], Counters(nodes_created=created, properties_set=props_set))
+
+    def _add_nodes(self, params):
+        created = props_set = 0
+        for value in params["values"]:
+            if isinstance(value, dict):
+                c, p = self._merge_node(value[self.key], value)
+            else:
+                c, p = self._merge_node(value)
+            created += c
+            props_set += p
+        self.version += 1
+        return Result([], Counters(nodes_created=created, properties_set=props_set))
+
+    def _add_nodes_ids(self, params):
+        result = self._add_nodes(params)
+        values = [v[self.key] if isinstance(v, dict) else v for v in params["values"]]
+        return Result([{"node": v, "id": self.node_ids[v]} for v in values], result._summary.counters)
+
+    def _add_edges_ids(self, params):
+        result = self._add_edges(params)
+        return Result([{"node1": u, "id1": self.node_ids[u], "node2": v, "id2": self.node_ids[v]}
+                       for u, v, _ in params["edges"]], result._summary.counters)
+
+    def _add_edges_by_id(self, params):
+        edges = [[u, v, props] for u, v, props, id1, id2 in params["edges"]
+                 if self.node_ids.get(u) == id1 and self.node_ids.get(v) == id2]
+        result = self._add_edges({"edges": edges})
+        return Result([{"matched": len(edges)}], result._summary.counters)
+
+    def _add_edge(self, params):
+        return self._add_edges({"edges": [[params["node1"], params["node2"], params.get("props")]]})
+
+    def _add_edges(self, params):
+        # Like the server, a map property fails the whole statement.
+        for _, _, props in params["edges"]:
+            if any(isinstance(value, dict) for value in (props or {}).values()):
+                raise CypherTypeError("Property values can only be of primitive types or arrays thereof")
+        nodes_created = relationships_created = props_set = 0
+        for u, v, props in params["edges"]:
+            nodes_created += self._merge_node(u)[0] + self._merge_node(v)[0]
+            c, p = self._merge_edge(u, v, props)
+            relationships_created += c
+            props_set += p
+        self.version += 1
+        return Result([], Counters(
+            nodes_created=nodes_created,
+            relationships_created=relationships_created,
+            properties_set=props_set
+        ))
+
+    def _detach_delete(self, value):
+        if value not in self.nodes:
+            return 0, 0
+        deleted = 0
+        for v in self.out.pop(value, ()):
+            del self.edges[(value, v)]
+            self.inc[v].discard(value)
+            deleted += 1
+        for u in self.inc.pop(value, ()):
+            if self.edges.pop((u, value), None) is not None:
+                self.out[u].discard(value)
+                deleted += 1
+        del self.nodes[value]
+        del self.node_ids[value]
+        return 1, deleted
+
+    def _remove_node(self, params):
+        nodes, relationships = self._detach_delete(params["value"])
+        self.version += 1
+        return Result([{"deletedNodes": nodes}], Counters(
+            nodes_deleted=nodes, relationships_deleted=relationships))
+
+    def _remove_nodes(self, params):
+        values = params.get("values", params.get("nodes"))
+        rows = []
+        relationships = 0
+        for value in values:
+            nodes, deleted = self._detach_delete(value)
+            rows.append({"value": value, "deletedNodes": nodes})
+            relationships += deleted
+        self.version += 1
+        return Result(rows, Counters(nodes_deleted=sum(r["deletedNodes"] for r in rows),
+                                     relationships_deleted=relationships))
+
+    def _remove_edges(self, params):
+        deleted = 0
+        for u, v in params["edges"]:
+            if self.edges.pop((u, v), None) is not None:
+                self.out[u].discard(v)
+                self.inc[v].discard(u)
+                deleted += 1
+        self.version += 1
+        return Result([], Counters(relationships_deleted=deleted))
+
+    def _set_nodes(self, params):
+        props_set = 0
+        for props in params["values"]:
+            if props[self.key] in self.nodes:
+                self.nodes[props[self.key]] = dict(props)
+                props_set += len(props)
+        self.version += 1
+        return Result([], Counters(properties_set=props_set))
+
+    def _set_edges(self, params):
+        props_set = 0
+        for u, v, props in params["edges"]:
+            if (u, v) in self.edges:
+                self.edges[(u, v)] = (self.edges[(u, v)][0], dict(props))
+                props_set += len(props)
+        self.version += 1
+        return Result([], Counters(properties_set=props_set))
+
+    def _clear_edges(self, params):
+        edges = list(itertools.islice(self.edges, params["limit"]))
+        for u, v in edges:
+            del self.edges[(u, v)]
+            self.out[u].discard(v)
+            self.inc[v].discard(u)
+        self.version += 1
+        return Result([], Counters(relationships_deleted=len(edges)))
+
+    def _clear_nodes(self, params):
+        nodes = list(itertools.islice(self.nodes, params["limit"]))
+        for n in nodes:
+            del self.nodes[n]
+            del self.node_ids[n]
+        self.version += 1
+        return Result([], Counters(nodes_deleted=len(nodes)))
+
+    # Algorithms
+
+    def _distance_sums(self, params):
+        rows = []
+        for source in params["nodes"]:
+            if source not in self.nodes:
+                continue
+            distances = {source: 0}
+            frontier = [source]
+            while frontier:
+                level = []
+                for u in frontier:
+                    for v, _ in self._neighbors(u, params["direction"]):
+                        if v not in distances:
+                            distances[v] = distances[u] + 1
+                            level.append(v)
+                frontier = level
+            reached = [d for v, d in distances.items() if v != source]
+            rows.append({
+                "node": source,
+                "reachable": len(reached),
+                "farness": float(sum(reached)),
+                "harmonic": sum(1.0 / d for d in reached)
+            })
+        return Result(rows)
+
+    def _node_triangles(self, params):
+        rows = []
+        for n in params["nodes"]:
+            if n not in self.nodes:
+                continue
+            neighbors = {v for v, _ in self._neighbors(n, "BOTH") if v != n}
+            triangles = len({frozenset((a, b)) for a in neighbors for b in self.out.get(a, ())
+                             if b in neighbors and b != a})
+            degree = len(neighbors)
+            rows.append({
+                "node": n,
+                "triangles": triangles,
+                "coefficient": 0.0 if degree < 2 else 2.0 * triangles / (degree * (degree - 1))
+            })
+        return Result(rows)
+
+    def _dijkstra(self, params):
+        source, weight, cutoff = params["source"], params["propertyName"], params["cutoff"]
+        direction = params["direction"]
+        if source not in self.nodes:
+            return Result([])
+        distances = {}
+        heap = [(0.0, 0, source)]
+        counter = itertools.count(1)
+        while heap:
+            distance, _, u = heapq.heappop(heap)
+            if u in distances:
+                continue
+            distances[u] = distance
+            for v, d in self._neighbors(u, direction):
+                if v not in distances:
+                    heapq.heappush(heap, (distance + d.get(weight, 1.0), next(counter), v))
+        reverse = _REVERSE[direction]
+        return Result({
+            "node": v,
+            "distance": distance,
+            "predecessors": [[u, d.get(weight, 1.0)] for u, d in self._neighbors(v, reverse)]
+        } for v, distance in sorted(distances.items(), key=lambda item: item[1])
+            if cutoff is None or distance <= cutoff)
+
+    def _load_graph(self, params):
+        return Result([{
+            "name": params["name"],
+            "nodes": len(self.nodes),
+            "relationships": len(self.edges),
+            "loadMillis": 0
+        }])
+
+    def _remove_graph(self, params):
+        return Result([{"removed": True}])
+
+    def _rows(self, name, build):
+        # Synthetic rows are built once per state of the graph, so that the
+        # benchmarks measure decoding rather than the stand-in.
+        cached = self._algorithm_rows.get(name)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, build())
+            self._algorithm_rows[name] = cached
+        return cached[1]
+
+    def _scores(self, column):
+        def handler(params):
+            rows = self._rows(column, lambda: [
+                {"node": k, column: 1.0 / (1 + i % 97)} for i, k in enumerate(self.nodes)
+            ])
+            return Result(rows)
+        return handler
+
+    def _write(self, rows, properties):
+        # Write mode of the procedures: store the values on the nodes and
+        # return only the summary row.
+        written = 0
+        for row in rows:
+            node = self.nodes[row["node"]]
+            for prop, column in properties:
+                node[prop] = row[column]
+            written += 1
+        return Result([{"nodes": written, "loadMillis": 0, "computeMillis": 0, "writeMillis": 0}])
+
+    def _write_scores(self, column, stream=None):
+        stream = stream or self._scores(column)
+
+        def handler(params):
+            return self._write(stream(params), [(params["writeProperty"], column)])
+        return handler
+
+    def _write_triangles(self, params):
+        return self._write(self._triangle_counts(params), [
+            (params["writeProperty"], "triangles"),
+            (params["coefficientProperty"], "coefficient")
+        ])
+
+    def _drain_property(self, params, name, *_):
+        nodes = [node for node in self.nodes.values() if name in node][:params["limit"]]
+        for node in nodes:
+            del node[name]
+        return Result([{"count": len(nodes)}], Counters(properties_set=len(nodes)))
+
+    def _move_property(self, params, name, target, *_):
+        nodes = [node for node in self.nodes.values() if name in node][:params["limit"]]
+        for node in nodes:
+            node[target] = node.pop(name) * params["scale"]
+        return Result([{"count": len(nodes)}], Counters(properties_set=2 * len(nodes)))
+
+    def _personalized_scores(self, params):
+        rows = self._rows("score", lambda: [
+            {"node": k, "score": 1.0 / (1 + i % 97)} for i, k in enumerate(self.nodes)
+        ])
+        return Result(dict(row, sourceSet=i) for i in range(len(params["sourceSets"])) for row in rows)
+
+    def _triangle_counts(self, params):
+        rows = self._rows("triangles", lambda: [
+            {"node": k, "triangles": i % 7, "coefficient": (i % 7) / 7.0} for i, k in enumerate(self.nodes)
+        ])
+        return Result(rows)
+
+    def _average_clustering(self, params):
+        return Result([{"averageClusteringCoefficient": 3 / 7.0}])
+
+    def _membership(self, params):
+        rows = self._rows("membership", lambda: [
+            {"node": k, "community": i % 100} for i, k in enumerate(self.nodes)
+        ])
+        return Result(rows)
+
+    def _component_sizes(self, params):
+        sizes = defaultdict(int)
+        for row in self._membership(params):
+            sizes[row["community"]] += 1
+        return Result({"community": c, "size": size} for c, size in sizes.items())
+
+    def _component_count(self, params):
+        return Result([{"nodes": len(self.nodes), "setCount": min(len(self.nodes), 100)}])
+
+    def _communities(self, params):
+        def build():
+            communities = defaultdict(list)
+            for i, k in enumerate(self.nodes):
+                communities[i % 100].append(k)
+            return [{"label": label, "setId": label, "nodes": nodes} for label, nodes in communities.items()]
+        return Result(self._rows("communities", build))
@@ -1,5 +1,9 @@
 from nxneo4j.centrality import *
 from nxneo4j.community import  *
 from nxneo4j.path_finding import *
+from nxneo4j.convert import to_networkx, from_networkx
+from nxneo4j.base_graph import MissingIndexWarning
 from nxneo4j.graph import Graph
-from nxneo4j.di_graph import DiGraph
\ No newline at end of file
+from nxneo4j.di_graph import DiGraph
+from nxneo4j.async_graph import AsyncGraph
+from nxneo4j.async_di_graph import AsyncDiGraph
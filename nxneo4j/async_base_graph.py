@@ -0,0 +1,131 @@
+import asyncio
+import functools
+import itertools
+from collections.abc import Iterator
+from nxneo4j.base_graph import NodeView, EdgeView, AdjacencyView, DegreeView
+
+# The methods that bind a session, transaction, batch or projection to the
+# calling thread. Every call of an async graph may run on another thread of
+# the executor, so they aren't offered.
+_THREAD_BOUND = {"session", "transaction", "batch", "projection"}
+
+_VIEWS = (NodeView, EdgeView, AdjacencyView, DegreeView)
+
+
+def _asynchronous(graph, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return AsyncCall(graph, fn, args, kwargs)
+    return wrapper
+
+
+class AsyncCall:
+    # A call of `fn(*args, **kwargs)` that runs on the executor of `graph`.
+    # Awaiting it returns the result, with generators read into a list;
+    # `async for` iterates the result instead, `graph.chunk_size` items per
+    # executor job, so a large result is never held at once.
+    def __init__(self, graph, fn, args, kwargs):
+        self.graph = graph
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def _result(self):
+        result = self.fn(*self.args, **self.kwargs)
+        if isinstance(result, Iterator):
+            return list(result)
+        return result
+
+    def __await__(self):
+        return self.graph._run(self._result).__await__()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        iterator = await self.graph._run(lambda: iter(self.fn(*self.args, **self.kwargs)))
+        chunk_size = self.graph.chunk_size
+        try:
+            while True:
+                chunk = await self.graph._run(lambda: list(itertools.islice(iterator, chunk_size)))
+                for item in chunk:
+                    yield item
+                if len(chunk) < chunk_size:
+                    return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                await self.graph._run(close)
+
+
+class AsyncView:
+    # Wraps a NodeView, EdgeView, AdjacencyView or DegreeView: `async for`
+    # iterates it, calling it or one of its methods returns an AsyncCall,
+    # `await view[n]` looks up one item and `await view.count()` is len().
+    def __init__(self, graph, view):
+        self.graph = graph
+        self.view = view
+
+    def __aiter__(self):
+        return AsyncCall(self.graph, iter, (self.view, ), {}).__aiter__()
+
+    def __call__(self, *args, **kwargs):
+        return AsyncCall(self.graph, self.view, args, kwargs)
+
+    def __getitem__(self, n):
+        return AsyncCall(self.graph, self.view.__getitem__, (n, ), {})
+
+    def count(self):
+        return AsyncCall(self.graph, len, (self.view, ), {})
+
+    def __getattr__(self, name):
+        attribute = getattr(self.view, name)
+        if not callable(attribute):
+            return attribute
+        return _asynchronous(self.graph, attribute)
+
+
+class AsyncBaseGraph:
+    # asyncio counterpart of BaseGraph. It wraps a graph of `graph_class` and
+    # runs each of its blocking calls on `executor`, the default executor of
+    # the event loop if None, so the loop keeps running during the round
+    # trips and several calls can run concurrently:
+    #
+    #     G = nxneo4j.AsyncGraph(driver, config)
+    #     await G.add_edges_from(edges)
+    #     scores = await G.pagerank(0.85, 20)
+    #     async for community in G.label_propagation():
+    #         ...
+    #     async for n, data in G.nodes(data=True):
+    #         ...
+    #
+    # Every method of the graph returns an AsyncCall. Views are wrapped in
+    # AsyncView. Module functions such as nxneo4j.betweenness_centrality run
+    # with `G.call(nxneo4j.betweenness_centrality, k=100)`.
+    graph_class = None
+
+    def __init__(self, driver, config=None, executor=None, chunk_size=1000):
+        self.wrapped = self.graph_class(driver, config)
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+    def _run(self, fn):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn)
+
+    def call(self, fn, *args, **kwargs):
+        # Runs `fn(G, *args, **kwargs)` with the wrapped graph as G.
+        return AsyncCall(self, fn, (self.wrapped, ) + args, kwargs)
+
+    def __aiter__(self):
+        return self.nodes.__aiter__()
+
+    def __getattr__(self, name):
+        if name in _THREAD_BOUND:
+            raise AttributeError("%s binds the calling thread, it isn't available on %s" % (
+                name, type(self).__name__))
+        attribute = getattr(self.wrapped, name)
+        if isinstance(attribute, _VIEWS):
+            return AsyncView(self, attribute)
+        if not callable(attribute):
+            return attribute
+        return _asynchronous(self, attribute)
@@ -0,0 +1,6 @@
+from nxneo4j.async_base_graph import AsyncBaseGraph
+from nxneo4j.di_graph import DiGraph
+
+
+class AsyncDiGraph(AsyncBaseGraph):
+    graph_class = DiGraph
@@ -0,0 +1,6 @@
+from nxneo4j.async_base_graph import AsyncBaseGraph
+from nxneo4j.graph import Graph
+
+
+class AsyncGraph(AsyncBaseGraph):
+    graph_class = Graph
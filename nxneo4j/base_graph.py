@@ -1,5 +1,298 @@
+import heapq
 import itertools
-from networkx.exception import NetworkXError
+import math
+import random
+import threading
+import time
+import uuid
+import warnings
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from networkx.exception import NetworkXError, NodeNotFound
+from neo4j import READ_ACCESS, WRITE_ACCESS
+try:
+    from neo4j import __version__ as _driver_version
+except ImportError:
+    _driver_version = "1"
+from neo4j.exceptions import TransientError
+from nxneo4j.batch import WriteBatch
+from nxneo4j.cache import ReadCache
+from nxneo4j import convert
+from nxneo4j.instrumentation import instrumented, current, TracedRunner
+
+
+class MissingIndexWarning(UserWarning):
+    pass
+
+
+_missing = object()
+
+_COUNTERS = (
+    "nodes_created",
+    "relationships_created",
+    "properties_set",
+    "nodes_deleted",
+    "relationships_deleted"
+)
+
+
+def _chunks(iterable, size):
+    # Splits `iterable` into lists of at most `size` items without
+    # materializing it; a `size` of None yields everything as one list.
+    if size is None:
+        chunk = list(iterable)
+        if chunk:
+            yield chunk
+        return
+    if size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _node_rows(values, attr, key):
+    # Returns whether the nodes carry properties and a lazy iterator over the
+    # rows to UNWIND: plain identifiers, or property maps that include the
+    # identifier. The iterator is None if there are no nodes at all.
+    values = iter(values)
+    try:
+        first = next(values)
+    except StopIteration:
+        return False, None
+    values = itertools.chain([first], values)
+
+    are_node_attrdict_tuple = False
+    try:
+        if isinstance(first[1], dict):
+            are_node_attrdict_tuple = True
+    except:
+        pass
+
+    if not are_node_attrdict_tuple and len(attr) == 0:
+        return False, values
+
+    def node_props(i):
+        n_d = dict(attr)
+        if are_node_attrdict_tuple:
+            n_d.update(i[1])
+            if key not in i[1]:
+                n_d[key] = i[0]
+        else:
+            n_d[key] = i
+        return n_d
+    return True, (node_props(i) for i in values)
+
+
+def _edge_row(edge, attr):
+    data = dict(attr)
+    if len(edge) > 2:
+        data.update(edge[2])
+    return [edge[0], edge[1], data]
+
+
+def _check_output(output):
+    if output not in ("numpy", "pandas"):
+        raise ValueError("output must be None, 'numpy' or 'pandas', not %r" % (output, ))
+
+
+def _columns(records, key, value, output, dtype=float):
+    # Decodes streamed records into two parallel NumPy arrays, or a pandas
+    # DataFrame, without building a dict entry per record. A driver result
+    # is read in bulk as value lists and transposed, so no field is looked
+    # up by name per record.
+    import numpy as np
+
+    if hasattr(records, "values"):
+        names = records.keys()
+        rows = records.values()
+    else:
+        names = (key, value)
+        rows = [(record[key], record[value]) for record in records]
+    columns = dict(zip(names, zip(*rows)))
+    keys = columns.get(key, ())
+    values = np.fromiter(columns.get(value, ()), dtype=dtype, count=len(rows))
+    # NumPy would coerce identifiers of mixed types to one of them, e.g.
+    # 1 and "1" both to strings, so those stay Python objects.
+    types = set(map(type, keys))
+    if str in types or len(types) > 1:
+        keys = np.array(keys, dtype=object)
+    else:
+        keys = np.array(keys)
+
+    if output == "numpy":
+        return keys, values
+    import pandas as pd
+    return pd.DataFrame({key: keys, value: values})
+
+
+def _select_scores(rows, value, output):
+    if output is None:
+        return {row["node"]: row[value] for row in rows}
+    _check_output(output)
+    return _columns(rows, "node", value, output)
+
+
+def _closeness(row, wf_improved, node_count):
+    # The formulas of algo.closeness.stream, from the number of nodes
+    # reached from a node and the sum of their distances.
+    reachable = row["reachable"]
+    if not row["farness"]:
+        return 0.0
+    centrality = reachable / row["farness"]
+    if wf_improved:
+        centrality *= reachable / (node_count - 1)
+    return centrality
+
+
+def _harmonic(row, node_count):
+    # algo.closeness.harmonic.stream normalizes by the number of other nodes.
+    if node_count < 2:
+        return 0.0
+    return row["harmonic"] / (node_count - 1)
+
+
+def _sample_size(node_count, k=None, epsilon=None, delta=0.1):
+    # Number of source nodes to sample for approximate betweenness: `k`, or
+    # enough sources that every normalized centrality is within `epsilon`
+    # of the exact value with probability 1 - `delta` (Hoeffding's bound
+    # with a union bound over all nodes), whichever is smaller.
+    if epsilon is not None:
+        needed = math.ceil(math.log(2 * node_count / delta) / (2 * epsilon ** 2))
+        k = needed if k is None else min(k, needed)
+    return k
+
+
+def _personalization_sources(personalization):
+    # The nodes a personalized PageRank restarts at, from a dict of weights
+    # as in networkx or a collection of nodes.
+    if personalization is None:
+        return []
+    if isinstance(personalization, dict):
+        return [n for n, weight in personalization.items() if weight > 0]
+    return list(personalization)
+
+
+def _round_robin(buckets):
+    # Circle method scheduling: every round pairs up all `buckets` (an even
+    # number) so that no bucket occurs twice within a round, and every
+    # pair of buckets occurs in exactly one round.
+    ring = list(range(1, buckets))
+    for _ in range(buckets - 1):
+        pairs = [(0, ring[0])] + [(ring[i], ring[-i]) for i in range(1, buckets // 2)]
+        yield [(min(i, j), max(i, j)) for i, j in pairs]
+        ring = ring[1:] + ring[:1]
+
+
+def _retry(fn, retries, backoff):
+    # Retries `fn` on transient errors such as detected deadlocks, with
+    # exponential backoff and jitter.
+    for attempt in itertools.count():
+        try:
+            return fn()
+        except TransientError:
+            if attempt >= retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+
+# Driver 4 renamed the access_mode of a session to default_access_mode and
+# rejects config keys it doesn't know.
+_ACCESS_MODE = "access_mode" if int(_driver_version.split(".")[0]) < 4 else "default_access_mode"
+
+
+def _open_session(driver, access_mode, **config):
+    config[_ACCESS_MODE] = access_mode
+    return driver.session(**config)
+
+
+def _managed(session, access_mode, work, *args):
+    # Driver 5 renamed read_transaction and write_transaction to
+    # execute_read and execute_write.
+    if access_mode == READ_ACCESS:
+        execute = getattr(session, "execute_read", None) or session.read_transaction
+    else:
+        execute = getattr(session, "execute_write", None) or session.write_transaction
+    return execute(work, *args)
+
+
+_ARROWS = {
+    "BOTH": ("-", "-"),
+    "OUTGOING": ("-", "->"),
+    "INCOMING": ("<-", "-")
+}
+
+_REVERSE = {
+    "BOTH": "BOTH",
+    "OUTGOING": "INCOMING",
+    "INCOMING": "OUTGOING"
+}
+
+
+def _is_bunch(nbunch):
+    # A container of nodes, as opposed to a single node; like in networkx,
+    # strings and tuples are taken as node identifiers.
+    if isinstance(nbunch, (str, bytes, tuple)):
+        return False
+    try:
+        iter(nbunch)
+    except TypeError:
+        return False
+    return True
+
+
+def _path(predecessors, v, reverse=False):
+    path = []
+    while v is not None:
+        path.append(v)
+        v = predecessors[v]
+    if not reverse:
+        path.reverse()
+    return path
+
+
+def _closest(v, candidates, distances, predecessors):
+    # The settled neighbor among the (neighbor, weight) pairs of the
+    # relationships of `v` whose distance plus weight comes closest to the
+    # distance of `v`, as (error, neighbor, tolerance, tie). The server may
+    # round distances, so errors up to half the smallest weight are
+    # tolerated. `tie` tells if a neighbor that may still match exactly is
+    # unsettled: one over a relationship of weight 0, as ties stream in any
+    # order, or one that streamed but waits itself.
+    distance = distances[v]
+    best = None
+    smallest = 0.0
+    tie = False
+    for u, weight in candidates:
+        if weight > 0 and (not smallest or weight < smallest):
+            smallest = weight
+        if u in predecessors:
+            error = abs(distances[u] + weight - distance)
+            if best is None or error < best[0]:
+                best = (error, u)
+        elif weight == 0 or u in distances:
+            tie = True
+    if best is None:
+        return None
+    return best[0], best[1], max(1e-9 * max(1.0, distance), 0.5 * smallest), tie
+
+
+def _settle(v, candidates, distances, predecessors):
+    # Settles `v` on its closest neighbor, unless that one is off and an
+    # unsettled neighbor may still match exactly.
+    closest = _closest(v, candidates, distances, predecessors)
+    if closest is None:
+        return False
+    error, u, tolerance, tie = closest
+    if error > tolerance or (tie and error > 1e-9 * max(1.0, distances[v])):
+        return False
+    predecessors[v] = u
+    return True
+
 
 class NodeView:
     def __init__(self, graph):
@@ -13,47 +306,119 @@ class NodeView:
     RETURN count(*) AS numberOfNodes
     """
 
+    @instrumented("NodeView.__len__")
     def __len__(self):
-        with self.graph.driver.session() as session:
-            query = self.number_of_nodes_query % self.graph.node_label
-            return session.run(query).peek()["numberOfNodes"]
+        query = self.number_of_nodes_query % self.graph.node_label
+        return self.graph._cached(
+            ("len", "nodes"),
+            lambda: self.graph._read(lambda tx: tx.run(query).single()["numberOfNodes"])
+        )
+
+    has_node_query = """\
+    MATCH (node:`%s` {`%s`: {value} })
+    RETURN count(node) > 0 AS exists
+    """
+
+    @instrumented("NodeView.__contains__")
+    def __contains__(self, n):
+        query = self.has_node_query % (self.graph.node_label, self.graph.identifier_property)
+        return self.graph._cached(
+            ("contains", n),
+            lambda: self.graph._read(lambda tx: tx.run(query, {"value": n}).single()["exists"])
+        )
 
     get_node_attributes_query = """\
     MATCH (node:`%s` {`%s`: {value} })
     RETURN node
     """
 
+    @instrumented("NodeView.__getitem__")
     def __getitem__(self, index):
-        with self.graph.driver.session() as session:
-            query = self.get_node_attributes_query % (
-                self.graph.node_label,
-                self.graph.identifier_property
-            )
-            key = self.graph.identifier_property
-            n = session.run(query, {"value": index}).single()["node"]
-            data = {k: n[k] for k in n.keys() if k!=key}
-            return data
+        query = self.get_node_attributes_query % (
+            self.graph.node_label,
+            self.graph.identifier_property
+        )
+        key = self.graph.identifier_property
+
+        def load():
+            n = self.graph._read(lambda tx: tx.run(query, {"value": index}).single()["node"])
+            n, = self.graph._remember_nodes([n])
+            return {k: n[k] for k in n.keys() if k!=key}
+
+        data = dict(self.graph._cached(("node", index), load))
+        return data
 
     get_nodes_query = """\
     MATCH (node:`%s`)
     RETURN node
     """
 
-    def __call__(self, data=False, default=None):
-        with self.graph.driver.session() as session:
-            query = self.get_nodes_query % (self.graph.node_label)
-            nodes = [r["node"] for r in session.run(query).records()]
-            key = self.graph.identifier_property
-            if not data:
-                for n in nodes:
-                    yield n[key]
-            elif isinstance(data, bool):
-                for n in nodes:
-                    rdata = {k: n[k] for k in n.keys() if k!=key}
-                    yield (n[key], rdata)
+    get_nodes_first_page_query = """\
+    MATCH (node:`%s`)
+    RETURN node
+    ORDER BY node.`%s`
+    LIMIT {limit}
+    """
+
+    get_nodes_next_page_query = """\
+    MATCH (node:`%s`)
+    WHERE node.`%s` > {after}
+    RETURN node
+    ORDER BY node.`%s`
+    LIMIT {limit}
+    """
+
+    @instrumented("NodeView.__call__")
+    def __call__(self, data=False, default=None, page_size=None, after=None):
+        key = self.graph.identifier_property
+        if page_size is None and after is None:
+            nodes = self._stream()
+        else:
+            nodes = self._paginate(page_size or self.graph.fetch_size, after)
+        if self.graph._ids is not None:
+            nodes = self.graph._remember_nodes(nodes)
+
+        if not data:
+            for n in nodes:
+                yield n[key]
+        elif isinstance(data, bool):
+            for n in nodes:
+                rdata = {k: n[k] for k in n.keys() if k!=key}
+                yield (n[key], rdata)
+        else:
+            for n in nodes:
+                yield n[key], n.get(data, default)
+
+    def _stream(self):
+        # Records are pulled from the server in chunks of `fetch_size` while
+        # the caller iterates, nothing is buffered on the client.
+        query = self.get_nodes_query % (self.graph.node_label)
+        for record in self.graph._stream(query):
+            yield record["node"]
+
+    def _paginate(self, page_size, after):
+        # Keyset pagination on the identifier property: every page is a
+        # separate short read transaction, so a long scan never keeps one
+        # transaction open and a dropped connection only retries one page.
+        label = self.graph.node_label
+        key = self.graph.identifier_property
+        first_page_query = self.get_nodes_first_page_query % (label, key)
+        next_page_query = self.get_nodes_next_page_query % (label, key, key)
+
+        def fetch_page(tx, after):
+            if after is None:
+                result = tx.run(first_page_query, {"limit": page_size})
             else:
-                for n in nodes:
-                    yield n[key], n.get(data, default)
+                result = tx.run(next_page_query, {"after": after, "limit": page_size})
+            return [r["node"] for r in result]
+
+        while True:
+            page = self.graph._read(fetch_page, after)
+            for n in page:
+                yield n
+            if len(page) < page_size:
+                return
+            after = page[-1][key]
 
 class EdgeView:
     def __init__(self, graph):
@@ -67,42 +432,272 @@ class EdgeView:
     RETURN COUNT(edge) AS numberOfEdges
     """
 
+    @instrumented("EdgeView.__len__")
     def __len__(self):
-        with self.graph.driver.session() as session:
-            query = self.number_of_edges_query % (
-                self.graph.node_label,
-                self.graph.relationship_type,
-                self.graph.node_label
-            )
-            return session.run(query).peek()["numberOfEdges"]
+        query = self.number_of_edges_query % (
+            self.graph.node_label,
+            self.graph.relationship_type,
+            self.graph.node_label
+        )
+        return self.graph._cached(
+            ("len", "edges"),
+            lambda: self.graph._read(lambda tx: tx.run(query).single()["numberOfEdges"])
+        )
 
     get_edges_query = """\
     MATCH (u:`%s`)-[edge:`%s`]->(v:`%s`)
     RETURN u.`%s` AS u, v.`%s` AS v, edge
     """
 
-    def __call__(self, data=False, default=None):
+    # The source nodes come from the identifier index in order, so a page
+    # reads only as many relationships as it returns.
+    get_edges_first_page_query = """\
+    MATCH (u:`%s`)
+    WHERE exists(u.`%s`)
+    WITH u ORDER BY u.`%s`
+    MATCH (u)-[edge:`%s`]->(v:`%s`)
+    RETURN u.`%s` AS u, v.`%s` AS v, edge, id(edge) AS edgeId
+    LIMIT {limit}
+    """
+
+    get_edges_next_page_query = """\
+    MATCH (u:`%s`)
+    WHERE u.`%s` > {after}
+    WITH u ORDER BY u.`%s`
+    MATCH (u)-[edge:`%s`]->(v:`%s`)
+    RETURN u.`%s` AS u, v.`%s` AS v, edge, id(edge) AS edgeId
+    LIMIT {limit}
+    """
+
+    get_edges_of_page_query = """\
+    MATCH (u:`%s` {`%s`: {after} })-[edge:`%s`]->(v:`%s`)
+    WHERE id(edge) > {afterEdge}
+    RETURN u.`%s` AS u, v.`%s` AS v, edge, id(edge) AS edgeId
+    ORDER BY edgeId
+    LIMIT {limit}
+    """
+
+    @instrumented("EdgeView.__call__")
+    def __call__(self, data=False, default=None, page_size=None, after=None):
         if self.graph.relationship_type is None:
             return # raises StopIteration
 
-        with self.graph.driver.session() as session:
-            query = self.get_edges_query % (
-                self.graph.node_label,
-                self.graph.relationship_type,
-                self.graph.node_label,
-                self.graph.identifier_property,
-                self.graph.identifier_property
-            )
-            edges = [(r["u"], r["v"], r["edge"]) for r in session.run(query).records()]
-            if not data:
-                for u, v, _ in edges:
-                    yield (u, v)
-            elif isinstance(data, bool):
-                for u, v, d in edges:
-                    yield (u, v, d)
+        if page_size is None and after is None:
+            edges = self._stream()
+        else:
+            edges = self._paginate(page_size or self.graph.fetch_size, after)
+
+        if not data:
+            for u, v, _ in edges:
+                yield (u, v)
+        elif isinstance(data, bool):
+            for u, v, d in edges:
+                yield (u, v, d)
+        else:
+            for u, v, d in edges:
+                yield (u, v, d.get(data, default))
+
+    def _stream(self):
+        query = self.get_edges_query % (
+            self.graph.node_label,
+            self.graph.relationship_type,
+            self.graph.node_label,
+            self.graph.identifier_property,
+            self.graph.identifier_property
+        )
+        for r in self.graph._stream(query):
+            yield r["u"], r["v"], r["edge"]
+
+    def _paginate(self, page_size, after):
+        # Pages are ordered by the source identifier. The relationships of a
+        # source node come in no particular order, so a page that ends
+        # inside a node leaves out that node; its relationships are then
+        # read by themselves, ordered by their internal id, which `after_edge`
+        # resumes behind.
+        label = self.graph.node_label
+        relationship_type = self.graph.relationship_type
+        key = self.graph.identifier_property
+        first_page_query = self.get_edges_first_page_query % (
+            label, key, key, relationship_type, label, key, key
+        )
+        next_page_query = self.get_edges_next_page_query % (
+            label, key, key, relationship_type, label, key, key
+        )
+        node_page_query = self.get_edges_of_page_query % (
+            label, key, relationship_type, label, key, key
+        )
+
+        def fetch_page(tx, query, params):
+            params["limit"] = page_size
+            return [(r["u"], r["v"], r["edge"], r["edgeId"]) for r in tx.run(query, params)]
+
+        # A caller supplied `after` resumes behind that source node, so none
+        # of its relationships are repeated.
+        after_edge = None
+        while True:
+            if after_edge is not None:
+                page = self.graph._read(fetch_page, node_page_query, {"after": after, "afterEdge": after_edge})
+                for u, v, d, _ in page:
+                    yield u, v, d
+                if len(page) < page_size:
+                    after_edge = None
+                else:
+                    after_edge = page[-1][3]
+                continue
+            if after is None:
+                page = self.graph._read(fetch_page, first_page_query, {})
             else:
-                for u, v, d in edges:
-                    yield (u, v, d.get(data, default))
+                page = self.graph._read(fetch_page, next_page_query, {"after": after})
+            if len(page) < page_size:
+                for u, v, d, _ in page:
+                    yield u, v, d
+                return
+            after = page[-1][0]
+            for u, v, d, _ in page:
+                if u == after:
+                    break
+                yield u, v, d
+            after_edge = -1
+
+class AdjacencyView:
+    # G.adj, G[u] and, on a DiGraph, G.succ and G.pred: maps every node to a
+    # dict of its neighbors in `direction` and the data of the connecting
+    # relationship.
+    def __init__(self, graph, direction):
+        self.graph = graph
+        self.direction = direction
+
+    def __iter__(self):
+        return iter(self.graph.nodes)
+
+    def __len__(self):
+        return len(self.graph.nodes)
+
+    def __contains__(self, n):
+        return n in self.graph.nodes
+
+    def _format(self, query):
+        left, right = _ARROWS[self.direction]
+        return query % (
+            self.graph.node_label,
+            self.graph.identifier_property,
+            left,
+            self.graph.relationship_type,
+            right,
+            self.graph.node_label,
+            self.graph.identifier_property
+        )
+
+    adjacency_query = """\
+    UNWIND {values} AS value
+    MATCH (u:`%s` {`%s`: value })
+    RETURN value, [(u)%s[edge:`%s`]%s(v:`%s`) | [v.`%s`, edge]] AS neighbors
+    """
+
+    @instrumented("AdjacencyView.__getitem__")
+    def __getitem__(self, n):
+        query = self._format(self.adjacency_query)
+        row = self.graph._read(lambda tx: tx.run(query, {"values": [n]}).single())
+        if row is None:
+            raise KeyError(n)
+        return {v: dict(d) for v, d in row["neighbors"]}
+
+    get_adjacency_query = """\
+    MATCH (u:`%s`)
+    RETURN u.`%s` AS node, [(u)%s[edge:`%s`]%s(v:`%s`) | [v.`%s`, edge]] AS neighbors
+    """
+
+    @instrumented("AdjacencyView.items")
+    def items(self):
+        # The neighbors of every node come in one streamed row per node.
+        query = self._format(self.get_adjacency_query)
+        for row in self.graph._stream(query):
+            yield row["node"], {v: dict(d) for v, d in row["neighbors"]}
+
+    neighbors_query = """\
+    UNWIND {values} AS value
+    MATCH (u:`%s` {`%s`: value })
+    RETURN value, [(u)%s[:`%s`]%s(v:`%s`) | v.`%s`] AS neighbors
+    """
+
+    @instrumented("AdjacencyView.neighbors")
+    def neighbors(self, nbunch):
+        # Returns a dict of the neighbor lists of all nodes in `nbunch`,
+        # fetched in one round trip.
+        values = list(dict.fromkeys(nbunch))
+        query = self._format(self.neighbors_query)
+        rows = self.graph._read(lambda tx: [(r["value"], r["neighbors"]) for r in tx.run(query, {"values": values})])
+        neighbors = {n: list(dict.fromkeys(vs)) for n, vs in rows}
+        for n in values:
+            if n not in neighbors:
+                raise NetworkXError("The node %s is not in the graph." % (n, ))
+        return neighbors
+
+class DegreeView:
+    # G.degree and, on a DiGraph, G.in_degree and G.out_degree. Iterating
+    # yields (node, degree) pairs from one streamed query, G.degree[n] is
+    # the degree of one node and G.degree(nbunch) fetches the degrees of
+    # several nodes in one round trip.
+    def __init__(self, graph, direction, weight=None):
+        self.graph = graph
+        self.direction = direction
+        self.weight = weight
+
+    def _format(self, query):
+        left, right = _ARROWS[self.direction]
+        if self.weight is None:
+            degree = "size((u)%s[:`%s`]%s(:`%s`))" % (
+                left, self.graph.relationship_type, right, self.graph.node_label
+            )
+        else:
+            degree = "reduce(total = 0, w IN [(u)%s[edge:`%s`]%s(:`%s`) | coalesce(edge[{weight}], 1)] | total + w)" % (
+                left, self.graph.relationship_type, right, self.graph.node_label
+            )
+        return query % (self.graph.node_label, self.graph.identifier_property, degree)
+
+    degrees_query = """\
+    UNWIND {values} AS value
+    MATCH (u:`%s` {`%s`: value })
+    RETURN value AS node, %s AS degree
+    """
+
+    get_degrees_query = """\
+    MATCH (u:`%s`)
+    RETURN u.`%s` AS node, %s AS degree
+    """
+
+    def __iter__(self):
+        return self._all()
+
+    def __len__(self):
+        return len(self.graph.nodes)
+
+    @instrumented("DegreeView.__iter__")
+    def _all(self):
+        query = self._format(self.get_degrees_query)
+        for row in self.graph._stream(query, {"weight": self.weight}):
+            yield row["node"], row["degree"]
+
+    @instrumented("DegreeView.__getitem__")
+    def __getitem__(self, n):
+        degrees = self._bunch([n])
+        if not degrees:
+            raise KeyError(n)
+        return degrees[0][1]
+
+    def _bunch(self, nbunch):
+        query = self._format(self.degrees_query)
+        params = {"values": list(nbunch), "weight": self.weight}
+        return self.graph._read(lambda tx: [(r["node"], r["degree"]) for r in tx.run(query, params)])
+
+    @instrumented("DegreeView.__call__")
+    def __call__(self, nbunch=None, weight=None):
+        view = self if weight == self.weight else DegreeView(self.graph, self.direction, weight)
+        if nbunch is None:
+            return view
+        if not _is_bunch(nbunch):
+            return view[nbunch]
+        return view._bunch(nbunch)
 
 class BaseGraph:
     def __init__(self, driver, direction, config=None):
@@ -116,6 +711,28 @@ class BaseGraph:
         self.relationship_type = config.get("relationship_type", "CONNECTED")
         self.graph = config.get("graph", "heavy")
         self.identifier_property = config.get("identifier_property", "id")
+        self.fetch_size = config.get("fetch_size", 1000)
+        self._identifier_indexed = None
+        # The session, transaction and write batch bound to each thread.
+        self._local = threading.local()
+        self._projection = None
+        self._listeners = []
+        self.profile_rate = config.get("profile_rate", 0.0)
+        self._cache = None
+        if config.get("cache_size"):
+            self._cache = ReadCache(config["cache_size"], config.get("cache_ttl"))
+        self.cache_check_interval = config.get("cache_check_interval")
+        # identifier -> id(n) of nodes this graph has written or read, used
+        # by add_edge and add_edges_from to find the endpoints by id.
+        self._ids = None
+        if config.get("id_cache_size"):
+            self._ids = ReadCache(config["id_cache_size"])
+        self._change_token = None
+        self._change_token_checked = None
+        self.backend = config.get("backend", "server")
+        self._snapshots = {}
+        if config.get("ensure_schema", False):
+            self.ensure_schema()
 
     def __iter__(self):
         return iter(self.nodes)
@@ -123,6 +740,9 @@ class BaseGraph:
     def __contains__(self, n):
         return n in self.nodes
 
+    def has_node(self, n):
+        return n in self.nodes
+
     def __len__(self):
         return len(self.nodes)
 
@@ -142,6 +762,278 @@ class BaseGraph:
         self.__dict__["edges"] = edges
         return edges
 
+    @property
+    def adj(self):
+        adj = AdjacencyView(self, self.direction)
+        self.__dict__["adj"] = adj
+        return adj
+
+    @property
+    def degree(self):
+        # The degree counts relationships in both directions, like in
+        # networkx also for directed graphs.
+        degree = DegreeView(self, "BOTH")
+        self.__dict__["degree"] = degree
+        return degree
+
+    def __getitem__(self, n):
+        return self.adj[n]
+
+    def neighbors(self, n):
+        return iter(self.adj.neighbors([n])[n])
+
+    def neighbors_of(self, nbunch):
+        return self.adj.neighbors(nbunch)
+
+    def instrument(self, listener):
+        # Calls `listener` with an instrumentation.Operation after every
+        # operation on this graph. With a `profile_rate` in the config, that
+        # fraction of the operations runs its queries with PROFILE.
+        self._listeners.append(listener)
+        return listener
+
+    def uninstrument(self, listener):
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def session(self, access_mode=WRITE_ACCESS):
+        # Binds one session to the graph for the current thread, every call
+        # inside the block reuses it instead of opening a session of its own.
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            yield session
+            return
+        with _open_session(self.driver, access_mode, fetch_size=self.fetch_size) as session:
+            self._local.session = session
+            try:
+                yield session
+            finally:
+                self._local.session = None
+
+    @contextmanager
+    def transaction(self, access_mode=WRITE_ACCESS):
+        # Runs every call inside the block in one explicit transaction that
+        # is committed when the block exits and rolled back if it raises.
+        tx = getattr(self._local, "tx", None)
+        if tx is not None:
+            yield tx
+            return
+        with self.session(access_mode) as session:
+            tx = session.begin_transaction()
+            self._local.tx = tx
+            try:
+                yield tx
+            except BaseException:
+                tx.rollback()
+                raise
+            else:
+                tx.commit()
+            finally:
+                self._local.tx = None
+                self._changed()
+
+    def _read(self, work, *args):
+        return self._execute(READ_ACCESS, work, *args)
+
+    def _write(self, work, *args):
+        self._changed()
+        try:
+            return self._execute(WRITE_ACCESS, work, *args)
+        finally:
+            # Other threads may have cached reads while the write ran.
+            self._changed()
+
+    def _changed(self):
+        # Called before and after every write made through this graph.
+        if self._projection is not None:
+            self._projection["stale"] = True
+        if self._cache is not None:
+            self._cache.clear()
+        self._snapshots = {}
+
+    def _cached(self, key, load):
+        # Returns the cached result of `load()` for `key`, if the graph has
+        # a cache. Reads inside an explicit transaction bypass the cache.
+        cache = self._cache
+        if cache is None or getattr(self._local, "tx", None) is not None:
+            return load()
+        self._check_changes()
+        value = cache.get(key, _missing)
+        if value is _missing:
+            generation = cache.generation
+            value = load()
+            cache.put(key, value, generation)
+        return value
+
+    def _check_changes(self):
+        if self.cache_check_interval is not None and (
+                self._change_token_checked is None or
+                time.monotonic() - self._change_token_checked >= self.cache_check_interval):
+            self.refresh_cache()
+
+    def clear_cache(self):
+        if self._cache is not None:
+            self._cache.clear()
+
+    def _remember(self, ids, generation=None):
+        # Stores (identifier, id(n)) pairs in the id cache. Nothing is stored
+        # inside an explicit transaction, which may still be rolled back.
+        if self._ids is None or getattr(self._local, "tx", None) is not None:
+            return
+        if ids:
+            self._ids.put_many(ids, generation)
+
+    def _remember_nodes(self, nodes):
+        # Passes the driver nodes read by a NodeView through, storing their
+        # ids on the way.
+        if self._ids is None or getattr(self._local, "tx", None) is not None:
+            yield from nodes
+            return
+        key = self.identifier_property
+        generation = self._ids.generation
+        for n in nodes:
+            node_id = getattr(n, "id", None)
+            if node_id is not None:
+                self._ids.put(n[key], node_id, generation)
+            yield n
+
+    def _forget(self, values=None):
+        # Drops removed nodes from the id cache, all of them without `values`.
+        if self._ids is None:
+            return
+        if values is None:
+            self._ids.clear()
+        else:
+            for value in values:
+                self._ids.discard(value)
+
+    last_committed_tx_query = """\
+    CALL dbms.queryJmx("org.neo4j:instance=kernel#0,name=Transactions")
+    YIELD attributes
+    RETURN attributes.LastCommittedTxId.value AS lastCommittedTxId
+    """
+
+    def last_committed_tx_id(self):
+        query = self.last_committed_tx_query
+        return self._read(lambda tx: tx.run(query).single()["lastCommittedTxId"])
+
+    def refresh_cache(self):
+        # Coarse invalidation for writes made by other clients: clears the
+        # cache if any transaction was committed since the last check. With
+        # `cache_check_interval` in the config this is done automatically
+        # at most once per interval.
+        token = self.last_committed_tx_id()
+        self._change_token_checked = time.monotonic()
+        if token != self._change_token:
+            self.clear_cache()
+            self._snapshots = {}
+            self._change_token = token
+
+    def _execute(self, access_mode, work, *args):
+        # Calls `work(tx, *args)` inside the bound transaction, or else as a
+        # managed transaction on the bound session or a new one. Managed
+        # transactions are retried on transient errors and routed to a
+        # reader or a writer of the cluster according to `access_mode`.
+        operation = current()
+        if operation is not None:
+            untraced = work
+            work = lambda tx, *args: untraced(TracedRunner(tx, operation), *args)
+        tx = getattr(self._local, "tx", None)
+        if tx is not None:
+            return work(tx, *args)
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            return _managed(session, access_mode, work, *args)
+        with _open_session(self.driver, access_mode) as session:
+            return _managed(session, access_mode, work, *args)
+
+    @contextmanager
+    def _runner(self, access_mode):
+        runner = getattr(self._local, "tx", None)
+        if runner is None:
+            runner = getattr(self._local, "session", None)
+        if runner is not None:
+            yield runner
+            return
+        with _open_session(self.driver, access_mode, fetch_size=self.fetch_size) as session:
+            yield session
+
+    def _stream(self, query, params=None, access_mode=READ_ACCESS):
+        # Yields the records of `query` while the server streams them.
+        with self._runner(access_mode) as runner:
+            operation = current()
+            if operation is not None:
+                runner = TracedRunner(runner, operation)
+            for record in runner.run(query, params):
+                yield record
+
+    indexes_query = """\
+    CALL db.indexes()
+    """
+
+    create_constraint_query = """\
+    CREATE CONSTRAINT ON (n:`%s`) ASSERT n.`%s` IS UNIQUE
+    """
+
+    create_index_query = """\
+    CREATE INDEX ON :`%s`(`%s`)
+    """
+
+    @instrumented("has_identifier_index")
+    def has_identifier_index(self):
+        # The columns of db.indexes() differ between Neo4j versions.
+        indexes = self._read(lambda tx: [dict(zip(r.keys(), r.values())) for r in tx.run(self.indexes_query)])
+        for index in indexes:
+            labels = index.get("tokenNames") or index.get("labelsOrTypes") or [index.get("label")]
+            if self.node_label in labels and list(index.get("properties") or []) == [self.identifier_property]:
+                self._identifier_indexed = True
+                return True
+        self._identifier_indexed = False
+        return False
+
+    @instrumented("ensure_schema")
+    def ensure_schema(self, unique=True):
+        # Creates a uniqueness constraint (or a plain index) on the
+        # identifier property unless one exists. Returns whether it did.
+        if self.has_identifier_index():
+            return False
+        if unique:
+            query = self.create_constraint_query % (self.node_label, self.identifier_property)
+        else:
+            query = self.create_index_query % (self.node_label, self.identifier_property)
+        self._write(lambda tx: tx.run(query).consume())
+        self._identifier_indexed = True
+        return True
+
+    def _check_schema(self):
+        # Called before bulk writes; the lookup is only done once per graph.
+        if self._identifier_indexed is None:
+            self.has_identifier_index()
+        if not self._identifier_indexed:
+            warnings.warn(
+                "Bulk write to :`%s` without an index on `%s`, every MERGE scans the label. "
+                "Call ensure_schema() to create one." % (self.node_label, self.identifier_property),
+                MissingIndexWarning,
+                stacklevel=3
+            )
+
+    @contextmanager
+    def batch(self, max_size=10000, max_delay=None):
+        # Buffers add_node, add_edge and remove_node calls made inside the
+        # block and writes them in bulk whenever `max_size` mutations are
+        # pending, `max_delay` seconds have passed, or the block exits.
+        # Pending mutations are dropped if the block raises. Like sessions,
+        # a batch only buffers the calls of the thread that opened it.
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            yield batch
+            return
+        batch = self._local.batch = WriteBatch(self, max_size, max_delay)
+        try:
+            yield batch
+            batch.flush()
+        finally:
+            self._local.batch = None
 
     add_node_query = """\
     MERGE (:`%s` {`%s`: {value} })
@@ -151,17 +1043,32 @@ class BaseGraph:
     MERGE (n:`%s` {`%s`: {value} })
     ON CREATE SET n+=$props
     """
+
+    @instrumented("add_node")
     def add_node(self, value, attr_dict=dict(), **attr):
-        with self.driver.session() as session:
-            if len(attr_dict) == 0 and len(attr) == 0:
-                query = self.add_node_query % (self.node_label, self.identifier_property)
-                session.run(query, {"value": value})
-            else:
-                props = dict(attr_dict)
-                for k, v in attr.items():
-                    props[k] = v
-                query = self.add_node_query_with_props % (self.node_label, self.identifier_property)
-                session.run(query, {"value": value}, props=props)
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            props = dict(attr_dict)
+            props.update(attr)
+            batch.add_node(value, props)
+            return
+        if self._ids is not None:
+            props = dict(attr_dict)
+            props.update(attr)
+            props[self.identifier_property] = value
+            write = self._write_ids(self._format_nodes(self.add_nodes_ids_query))
+            self._run_batches(write, [props], None, None)
+            return
+        if len(attr_dict) == 0 and len(attr) == 0:
+            query = self.add_node_query % (self.node_label, self.identifier_property)
+            params = {"value": value}
+        else:
+            props = dict(attr_dict)
+            for k, v in attr.items():
+                props[k] = v
+            query = self.add_node_query_with_props % (self.node_label, self.identifier_property)
+            params = {"value": value, "props": props}
+        self._write(lambda tx: tx.run(query, params).consume())
 
     add_nodes_query = """\
     UNWIND {values} AS value
@@ -174,38 +1081,45 @@ class BaseGraph:
     ON CREATE SET n=props
     """
 
-    def add_nodes_from(self, values, **attr):
-        are_node_attrdict_tuple = False
-        try:
-            for v in values:
-                if isinstance(v[1], dict):
-                    are_node_attrdict_tuple = True
-                break
-        except:
-            pass
+    add_nodes_ids_query = """\
+    UNWIND {values} AS props
+    MERGE (n:`%s` {`%s`: props.`%s` })
+    ON CREATE SET n=props
+    RETURN props.`%s` AS node, id(n) AS id
+    """
+
+    add_nodes_ids_query_without_props = """\
+    UNWIND {values} AS value
+    MERGE (n:`%s` {`%s`: value })
+    RETURN value AS node, id(n) AS id
+    """
 
-        if are_node_attrdict_tuple or len(attr) > 0:
+    @instrumented("add_nodes_from")
+    def add_nodes_from(self, values, batch_size=None, progress=None, **attr):
+        # `values` is only traversed once, so generators are fine. With a
+        # `batch_size` the input is written in chunks, each in its own
+        # transaction, and only one chunk is held in memory at a time.
+        with_props, values = _node_rows(values, attr, self.identifier_property)
+        if values is None:
+            return []
+        self._check_schema()
+
+        if self._ids is not None:
+            if with_props:
+                query = self._format_nodes(self.add_nodes_ids_query)
+            else:
+                query = self.add_nodes_ids_query_without_props % (self.node_label, self.identifier_property)
+            return self._run_batches(self._write_ids(query), values, batch_size, progress)
+        if with_props:
             query = self.add_nodes_query_with_attrdict % (
                 self.node_label,
                 self.identifier_property,
                 self.identifier_property
             )
-            n_values = []
-            for i in values:
-                n_d = dict(attr)
-                if are_node_attrdict_tuple:
-                    n_d.update(i[1])
-                    if self.identifier_property not in i[1]:
-                        n_d[self.identifier_property] = i[0]
-                else:
-                    n_d[self.identifier_property] = i
-                n_values.append(n_d)
-            values = n_values
         else:
             query = self.add_nodes_query % (self.node_label, self.identifier_property)
 
-        with self.driver.session() as session:
-            session.run(query, {"values": values})
+        return self._write_batches(query, "values", values, batch_size, progress)
 
     add_edge_query = """\
     MERGE (node1:`%s` {`%s`: {node1} })
@@ -214,16 +1128,24 @@ class BaseGraph:
     ON CREATE SET r=$props
     """
 
+    @instrumented("add_edge")
     def add_edge(self, node1, node2, **attr):
-        with self.driver.session() as session:
-            query = self.add_edge_query % (
-                self.node_label,
-                self.identifier_property,
-                self.node_label,
-                self.identifier_property,
-                self.relationship_type
-            )
-            session.run(query, {"node1": node1, "node2": node2}, props=attr)
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.add_edge(node1, node2, attr)
+            return
+        if self._ids is not None:
+            self._run_batches(self._write_edges, [[node1, node2, attr]], None, None)
+            return
+        query = self.add_edge_query % (
+            self.node_label,
+            self.identifier_property,
+            self.node_label,
+            self.identifier_property,
+            self.relationship_type
+        )
+        params = {"node1": node1, "node2": node2, "props": attr}
+        self._write(lambda tx: tx.run(query, params).consume())
 
     add_edges_query = """\
     UNWIND {edges} AS edge
@@ -233,21 +1155,194 @@ class BaseGraph:
     ON CREATE SET r=edge[2]
     """
 
-    def add_edges_from(self, edges, **attr):
-        with self.driver.session() as session:
-            query = self.add_edges_query % (
-                self.node_label,
-                self.identifier_property,
-                self.node_label,
-                self.identifier_property,
-                self.relationship_type
-            )
-            def fix_edge(edge):
-                if len(edge) == 2:
-                    edge.append({})
-                return edge
-            session.run(query, {"edges": [fix_edge(list(edge)) for edge in edges]})
+    add_edges_ids_query = """\
+    UNWIND {edges} AS edge
+    MERGE (node1:`%s` {`%s`: edge[0] })
+    MERGE (node2:`%s` {`%s`: edge[1] })
+    MERGE (node1)-[r:`%s`]->(node2)
+    ON CREATE SET r=edge[2]
+    RETURN edge[0] AS node1, id(node1) AS id1, edge[1] AS node2, id(node2) AS id2
+    """
+
+    add_edges_by_id_query = """\
+    UNWIND {edges} AS edge
+    MATCH (node1), (node2)
+    WHERE id(node1) = edge[3] AND id(node2) = edge[4]
+      AND node1:`%s` AND node1.`%s` = edge[0]
+      AND node2:`%s` AND node2.`%s` = edge[1]
+    MERGE (node1)-[r:`%s`]->(node2)
+    ON CREATE SET r=edge[2]
+    RETURN count(*) AS matched
+    """
 
+    @instrumented("add_edges_from")
+    def add_edges_from(self, edges, batch_size=None, progress=None, **attr):
+        self._check_schema()
+        edges = (_edge_row(edge, attr) for edge in edges)
+        if self._ids is not None:
+            return self._run_batches(self._write_edges, edges, batch_size, progress)
+        query = self.add_edges_query % (
+            self.node_label,
+            self.identifier_property,
+            self.node_label,
+            self.identifier_property,
+            self.relationship_type
+        )
+        return self._write_batches(query, "edges", edges, batch_size, progress)
+
+    def _format_nodes(self, query):
+        key = self.identifier_property
+        return query % (self.node_label, key, key, key)
+
+    def _format_edges(self, query):
+        key = self.identifier_property
+        return query % (self.node_label, key, self.node_label, key, self.relationship_type)
+
+    def _write_ids(self, query, parameter="values"):
+        # A `write` for _run_batches that runs `query` and returns the
+        # (node, id) pairs of its records.
+        def write(tx, batch):
+            result = tx.run(query, {parameter: batch})
+            ids = [(record["node"], record["id"]) for record in result]
+            return [result.consume().counters], ids
+        return write
+
+    def _write_edges(self, tx, batch):
+        # Relationships between two cached endpoints are matched by id,
+        # without an index lookup. The id query also checks the label and
+        # the identifier, so a stale id, of a node deleted by another client
+        # or reused since, matches nothing. The whole chunk is then merged
+        # again on the identifiers, which is idempotent for the rows that
+        # did match and returns the current ids.
+        cached = self._ids.get_many({value for edge in batch for value in edge[:2]})
+        known, rest = [], []
+        for edge in batch:
+            id1 = cached.get(edge[0])
+            id2 = None if id1 is None else cached.get(edge[1])
+            if id2 is None:
+                rest.append(edge)
+            else:
+                known.append(edge + [id1, id2])
+        counters, ids = [], []
+        if known:
+            result = tx.run(self._format_edges(self.add_edges_by_id_query), {"edges": known})
+            matched = result.single()["matched"]
+            counters.append(result.consume().counters)
+            if matched < len(known):
+                rest.extend(edge[:3] for edge in known)
+        if rest:
+            result = tx.run(self._format_edges(self.add_edges_ids_query), {"edges": rest})
+            for record in result:
+                ids.append((record["node1"], record["id1"]))
+                ids.append((record["node2"], record["id2"]))
+            counters.append(result.consume().counters)
+        return counters, ids
+
+    @instrumented("load_edges")
+    def load_edges(self, edges, workers=8, batch_size=10000, window=None,
+                   retries=5, backoff=0.1, progress=None, **attr):
+        # Parallel version of add_edges_from. Nodes are hashed into
+        # 2 * `workers` buckets and every edge is assigned to the cell of its
+        # two endpoint buckets. The cells of one round cover disjoint
+        # buckets, so concurrent transactions never MERGE the same node and
+        # cannot deadlock on each other; rounds run one after another.
+        # At most `window` edges are partitioned and held in memory at once.
+        # Every batch is its own transaction: when one fails, the batches
+        # committed before it are still reported to `progress` and the error
+        # is raised once the cells of its round are done.
+        self._check_schema()
+        query = self.add_edges_query % (
+            self.node_label,
+            self.identifier_property,
+            self.node_label,
+            self.identifier_property,
+            self.relationship_type
+        )
+        buckets = 2 * workers
+        rounds = [[(i, i) for i in range(buckets)]] + list(_round_robin(buckets))
+        if window is None:
+            window = batch_size * buckets * (buckets + 1) // 2
+
+        # The cells are written on other threads, which record their queries
+        # on the operation of this one.
+        operation = current()
+
+        def write_cell(cell_edges):
+            cell_stats = []
+            try:
+                with _open_session(self.driver, WRITE_ACCESS) as session:
+                    if operation is not None:
+                        session = TracedRunner(session, operation)
+                    for batch in _chunks(cell_edges, batch_size):
+                        run = lambda: session.run(query, {"edges": batch}).consume()
+                        counters = _retry(run, retries, backoff).counters
+                        self._changed()
+                        cell_stats.append({
+                            "size": len(batch),
+                            "nodes_created": counters.nodes_created,
+                            "relationships_created": counters.relationships_created,
+                            "properties_set": counters.properties_set
+                        })
+            except Exception as error:
+                return cell_stats, error
+            return cell_stats, None
+
+        stats = []
+        written = 0
+        self._changed()
+        rows = (_edge_row(edge, attr) for edge in edges)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for chunk in _chunks(rows, window):
+                cells = {}
+                for row in chunk:
+                    i = hash(row[0]) % buckets
+                    j = hash(row[1]) % buckets
+                    cells.setdefault((min(i, j), max(i, j)), []).append(row)
+                for cells_round in rounds:
+                    futures = [executor.submit(write_cell, cells[cell])
+                               for cell in cells_round if cell in cells]
+                    errors = []
+                    for future in futures:
+                        cell_stats, error = future.result()
+                        if error is not None:
+                            errors.append(error)
+                        for batch_stats in cell_stats:
+                            stats.append(batch_stats)
+                            written += batch_stats["size"]
+                            if progress is not None:
+                                progress(written, batch_stats)
+                    if errors:
+                        raise errors[0]
+        return stats
+
+    def _write_batches(self, query, parameter, items, batch_size, progress):
+        # Runs `query` once per chunk of `items` and returns the write
+        # counters of every chunk. `progress` is called after each chunk with
+        # the number of items written so far and the counters of that chunk.
+        write = lambda tx, batch: ([tx.run(query, {parameter: batch}).consume().counters], [])
+        return self._run_batches(write, items, batch_size, progress)
+
+    def _run_batches(self, write, items, batch_size, progress):
+        # Like _write_batches, with `write(tx, batch)` returning the counters
+        # of its queries and the (node, id) pairs for the id cache, which are
+        # stored once the transaction is committed.
+        stats = []
+        written = 0
+        with self.session():
+            for batch in _chunks(items, batch_size):
+                generation = None if self._ids is None else self._ids.generation
+                counters, ids = self._write(write, batch)
+                self._remember(ids, generation)
+                batch_stats = {"size": len(batch)}
+                for name in _COUNTERS:
+                    batch_stats[name] = sum(getattr(c, name) for c in counters)
+                stats.append(batch_stats)
+                written += len(batch)
+                if progress is not None:
+                    progress(written, batch_stats)
+        return stats
+
+    @instrumented("add_path")
     def add_path(self, path, **attr):
         for u, v in itertools.izip(path, path[1:]):
             self.add_edge(u, v, **attr)
@@ -258,85 +1353,328 @@ class BaseGraph:
     RETURN COUNT(*) AS deletedNodes;
     """
 
+    @instrumented("remove_node")
     def remove_node(self, n):
-        with self.driver.session() as session:
-            query = self.remove_node_query % (self.node_label, self.identifier_property)
-            deleted_nodes = session.run(query, {"value": n}).peek()["deletedNodes"]
-            if deleted_nodes < 1:
-                raise NetworkXError("The node %s is not in the graph." % (n, ))
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            batch.remove_node(n)
+            return
+        query = self.remove_node_query % (self.node_label, self.identifier_property)
+        deleted_nodes = self._write(lambda tx: tx.run(query, {"value": n}).single()["deletedNodes"])
+        self._forget([n])
+        if deleted_nodes < 1:
+            raise NetworkXError("The node %s is not in the graph." % (n, ))
 
     remove_nodes_query = """\
-    UNWIND $nodes as value
-    MERGE (n:`%s` {`%s`: value })
+    UNWIND {nodes} AS value
+    MATCH (n:`%s` {`%s`: value })
     DETACH DELETE n
     """
 
-    def remove_nodes_from(self, nodes):
-        with self.driver.session() as session:
-            query = self.remove_nodes_query % (self.node_label, self.identifier_property)
-            session.run(query, {"nodes": nodes})
+    @instrumented("remove_nodes_from")
+    def remove_nodes_from(self, nodes, batch_size=10000, progress=None):
+        # Removes the nodes and their relationships in one transaction per
+        # `batch_size` nodes; nodes that aren't in the graph are skipped.
+        # Returns the counters of every batch, see add_nodes_from.
+        query = self.remove_nodes_query % (self.node_label, self.identifier_property)
+        try:
+            return self._write_batches(query, "nodes", nodes, batch_size, progress)
+        finally:
+            self._forget()
 
-    def update(self, edges=None, nodes=None, graph_id_props=None):
+    @instrumented("update")
+    def update(self, edges=None, nodes=None, graph_id_props=None, batch_size=10000):
         if edges is not None:
             if nodes is not None:
-                self.add_nodes_from(edges)
-                self.add_edges_from(nodes)
+                self.add_nodes_from(nodes, batch_size=batch_size)
+                self.add_edges_from(edges, batch_size=batch_size)
+            elif hasattr(edges, "nodes") and hasattr(edges, "edges"):
+                convert.from_networkx(edges, self, batch_size, graph_id_props=graph_id_props)
             else:
-                try:
-                    graph_nodes = edges.nodes
-                    graph_edges = edges.edges
-                except:
-                    self.add_edges_from(edges)
+                self.add_edges_from(edges, batch_size=batch_size)
+        elif nodes is not None:
+            self.add_nodes_from(nodes, batch_size=batch_size)
+
+    sync_nodes_query = """\
+    UNWIND {values} AS props
+    MATCH (n:`%s` {`%s`: props.`%s` })
+    SET n = props
+    """
+
+    sync_edges_query = """\
+    UNWIND {edges} AS edge
+    MATCH (:`%s` {`%s`: edge[0] })-[r:`%s`]->(:`%s` {`%s`: edge[1] })
+    SET r = edge[2]
+    """
+
+    remove_edges_query = """\
+    UNWIND {edges} AS edge
+    MATCH (:`%s` {`%s`: edge[0] })-[r:`%s`]->(:`%s` {`%s`: edge[1] })
+    DELETE r
+    """
+
+    @instrumented("sync")
+    def sync(self, graph, batch_size=10000, progress=None, graph_id_props=None):
+        # Makes G equal to the networkx `graph` by writing only the
+        # difference: the missing nodes and edges are added, the ones that
+        # aren't in `graph` removed and those whose properties differ
+        # overwritten, unlike update, which never changes existing items.
+        # The stored graph is read once and reduced to one fingerprint per
+        # node and relationship, so the reads still scale with the graph;
+        # the writes and the memory held for them scale with the difference.
+        # Nodes are resolved as in from_networkx.
+        key = self.identifier_property
+        directed = self.direction != "BOTH"
+
+        def edge_key(u, v):
+            return (u, v) if directed else frozenset((u, v))
+
+        query = convert.nodes_query % (self.node_label, key, convert._projection("node", True))
+        stored_nodes = {
+            row["node"]: convert._fingerprint(convert._data(row["data"], True, key))
+            for row in self._stream(query, {"keys": True})
+        }
+        stored_edges = {}
+        # An undirected graph can store a relationship in both directions,
+        # only the first one read is kept.
+        duplicate_edges = []
+        if self.relationship_type is not None:
+            query = convert.edges_query % (
+                self.node_label, self.relationship_type, self.node_label, key, key,
+                convert._projection("edge", True)
+            )
+            for row in self._stream(query, {"keys": True}):
+                k = edge_key(row["u"], row["v"])
+                if k in stored_edges:
+                    duplicate_edges.append([row["u"], row["v"]])
                 else:
-                    graph_nodes_data = graph_nodes(data=True)
-                    graph_edges_data = graph_edges(data=True)
-                    adding_edges = []
-                    for u, v, data in graph_edges_data:
-                        try:
-                            if self.identifier_property in graph_nodes[u]:
-                                u = graph_nodes[u][self.identifier_property]
-                        except:
-                            pass
-                        try:
-                            if self.identifier_property in graph_nodes[v]:
-                                v = graph_nodes[v][self.identifier_property]
-                        except:
-                            pass
-                        adding_edges.append((u, v, data))
-                    graph_nodes_data = graph_nodes(data=True)
-                    graph_nodes_fixed_data = []
-                    for n, d in graph_nodes_data:
-                        if graph_id_props is not None:
-                            if isinstance(graph_id_props, tuple) or isinstance(graph_id_props, list):
-                                for value, v in zip(n, graph_id_props):
-                                    d[v] = value
-                            else:
-                                d[graph_id_props] = n
-                        graph_nodes_fixed_data.append((n, d))
-                    self.add_nodes_from(graph_nodes_fixed_data)
-                    self.add_edges_from(adding_edges)
+                    stored_edges[k] = (row["u"], row["v"], convert._fingerprint(row["data"]))
+
+        renamed = {}
+        added_nodes, changed_nodes = [], []
+        for n, d in convert._nodes(graph, key, graph_id_props, renamed):
+            props = {k: value for k, value in d.items() if value is not None}
+            props[key] = n
+            fingerprint = stored_nodes.pop(n, None)
+            if fingerprint is None:
+                added_nodes.append(props)
+            elif fingerprint != convert._fingerprint(convert._data(props, True, key)):
+                changed_nodes.append(props)
+
+        added_edges, changed_edges = [], []
+        if self.relationship_type is not None:
+            for u, v, d in convert._edges(graph, renamed):
+                props = {k: value for k, value in d.items() if value is not None}
+                stored = stored_edges.pop(edge_key(u, v), None)
+                if stored is None:
+                    added_edges.append([u, v, props])
+                elif stored[2] != convert._fingerprint(props):
+                    changed_edges.append([stored[0], stored[1], props])
+        removed_edges = duplicate_edges + [[u, v] for u, v, _ in stored_edges.values()]
+
+        label, relationship_type = self.node_label, self.relationship_type
+        node_query = lambda query: query % (label, key, key)
+        edge_query = lambda query: query % (label, key, relationship_type, label, key)
+        writes = [
+            ("edges_removed", edge_query(self.remove_edges_query), "edges", removed_edges),
+            ("nodes_removed", self.remove_nodes_query % (label, key), "nodes", list(stored_nodes)),
+            ("nodes_added", node_query(self.add_nodes_query_with_attrdict), "values", added_nodes),
+            ("nodes_changed", node_query(self.sync_nodes_query), "values", changed_nodes),
+            ("edges_added", self.add_edges_query % (label, key, label, key, relationship_type),
+             "edges", added_edges),
+            ("edges_changed", edge_query(self.sync_edges_query), "edges", changed_edges)
+        ]
+        if added_nodes or added_edges:
+            self._check_schema()
+        summary = {}
+        try:
+            for name, query, parameter, items in writes:
+                summary[name] = len(items)
+                if items:
+                    self._write_batches(query, parameter, items, batch_size, progress)
+        finally:
+            if stored_nodes:
+                self._forget()
+        return summary
 
     _clear_graph_nodes_query = """\
     MATCH (n:`%s`)
+    WITH n LIMIT {limit}
     DELETE n
     """
 
     _clear_graph_edges_query = """\
-    MATCH (:`%s`)-[r:`%s`]-(:`%s`)
+    MATCH (:`%s`)-[r:`%s`]->(:`%s`)
+    WITH r LIMIT {limit}
     DELETE r
     """
 
-    def clear(self):
-        with self.driver.session() as session:
+    @instrumented("clear")
+    def clear(self, batch_size=10000, progress=None):
+        # Deletes the relationships and then the nodes, at most `batch_size`
+        # per transaction, so neither the transaction state on the server
+        # nor the time locks are held grows with the graph. `progress` is
+        # called after every transaction with the number of relationships
+        # and nodes deleted so far and the counters of that transaction.
+        if batch_size is None or batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        deleted = 0
+        self._forget()
+        with self.session():
             if self.relationship_type:
                 query = self._clear_graph_edges_query % (
                     self.node_label,
                     self.relationship_type,
                     self.node_label
                 )
-                session.run(query)
+                deleted = self._delete_batches(query, batch_size, progress, deleted)
             query = self._clear_graph_nodes_query % (self.node_label)
-            session.run(query)
+            self._delete_batches(query, batch_size, progress, deleted)
+
+    def _delete_batches(self, query, batch_size, progress, deleted):
+        # Runs `query` until a transaction deletes less than `batch_size`.
+        while True:
+            counters = self._write(lambda tx: tx.run(query, {"limit": batch_size}).consume().counters)
+            batch_stats = {
+                "nodes_deleted": counters.nodes_deleted,
+                "relationships_deleted": counters.relationships_deleted
+            }
+            batch = counters.nodes_deleted + counters.relationships_deleted
+            deleted += batch
+            if progress is not None:
+                progress(deleted, batch_stats)
+            if batch < batch_size:
+                return deleted
+
+    load_graph_query = """\
+    CALL algo.graph.load({name}, {nodeLabel}, {relationshipType}, {
+      graph: {graph},
+      direction: {direction},
+      relationshipWeight: {weight}
+    })
+    YIELD name, nodes, relationships, loadMillis
+    RETURN name, nodes, relationships, loadMillis
+    """
+
+    remove_graph_query = """\
+    CALL algo.graph.remove({name})
+    YIELD removed
+    RETURN removed
+    """
+
+    @instrumented("load")
+    def load(self, name=None, weight=None):
+        # Loads the label/relationship type into a named in-memory graph on
+        # the server, which algorithms then reuse instead of projecting the
+        # graph on every call. Writes through this graph mark it stale, and
+        # the next algorithm call replaces it with a fresh projection.
+        if self._projection is not None:
+            self.unload()
+        if name is None:
+            name = "nxneo4j-%s" % uuid.uuid4().hex
+        params = {
+            "name": name,
+            "nodeLabel": self.node_label,
+            "relationshipType": self.relationship_type,
+            "graph": self.graph,
+            "direction": self.direction,
+            "weight": weight
+        }
+        query = self.load_graph_query
+        row = self._execute(WRITE_ACCESS, lambda tx: tx.run(query, params).single())
+        self._projection = {"name": name, "weight": weight, "stale": False}
+        return {k: row[k] for k in ("name", "nodes", "relationships", "loadMillis")}
+
+    @instrumented("unload")
+    def unload(self):
+        if self._projection is None:
+            return False
+        name = self._projection["name"]
+        self._projection = None
+        query = self.remove_graph_query
+        return self._execute(WRITE_ACCESS, lambda tx: tx.run(query, {"name": name}).single()["removed"])
+
+    @contextmanager
+    def projection(self, name=None, weight=None):
+        self.load(name, weight)
+        try:
+            yield self
+        finally:
+            self.unload()
+
+    snapshot_nodes_query = """\
+    MATCH (node:`%s`)
+    RETURN id(node) AS nodeId, node.`%s` AS node
+    """
+
+    snapshot_edges_query = """\
+    MATCH (u:`%s`)-[edge:`%s`]->(v:`%s`)
+    RETURN id(u) AS u, id(v) AS v, coalesce(edge[{weight}], 1.0) AS weight
+    """
+
+    @instrumented("snapshot")
+    def snapshot(self, weight=None):
+        # Copies the graph into a local nxneo4j.snapshot.Snapshot with two
+        # streamed reads; the relationships only keep `weight`. Needs numpy.
+        from nxneo4j.snapshot import Snapshot, DiSnapshot
+
+        nodes_query = self.snapshot_nodes_query % (self.node_label, self.identifier_property)
+        edges_query = self.snapshot_edges_query % (self.node_label, self.relationship_type, self.node_label)
+        node_ids, keys = array("q"), []
+        sources, targets, weights = array("q"), array("q"), array("d")
+        with self.session(READ_ACCESS):
+            for row in self._stream(nodes_query):
+                node_ids.append(row["nodeId"])
+                keys.append(row["node"])
+            for row in self._stream(edges_query, {"weight": weight}):
+                sources.append(row["u"])
+                targets.append(row["v"])
+                weights.append(row["weight"])
+
+        cls = Snapshot if self.direction == "BOTH" else DiSnapshot
+        return cls.build(node_ids, keys, sources, targets, None if weight is None else weights, weight)
+
+    def local_snapshot(self, weight=None):
+        # The snapshot the "local" backend runs the algorithms on. It is
+        # taken once and reused until the graph is written through, or
+        # refresh_cache() sees a commit of another client. Algorithms
+        # without a weight use any snapshot that was already taken.
+        self._check_changes()
+        snapshots = self._snapshots
+        snapshot = snapshots.get(weight)
+        if snapshot is None and weight is None and snapshots:
+            snapshot = next(iter(snapshots.values()))
+        if snapshot is None:
+            snapshot = snapshots[weight] = self.snapshot(weight)
+        return snapshot
+
+    def _algorithm(self, work, *args, access_mode=None):
+        # A named projection only exists on the cluster member that loaded
+        # it, so while one is in use algorithms run on the writer.
+        if access_mode is None:
+            access_mode = self._algorithm_access_mode()
+        return self._execute(access_mode, work, *args)
+
+    def _algorithm_access_mode(self):
+        return READ_ACCESS if self._projection is None else WRITE_ACCESS
+
+    def _scores(self, query, params, value, output, dtype=float):
+        # Returns the `value` column per node as a dict, or with
+        # output="numpy"/"pandas" as parallel arrays or a DataFrame.
+        if output is None:
+            return self._algorithm(lambda tx: {row["node"]: row[value] for row in tx.run(query, params)})
+        _check_output(output)
+        return self._algorithm(lambda tx: _columns(tx.run(query, params), "node", value, output, dtype))
+
+    def _write_back(self, query, params, write_property):
+        # Runs the write mode of an algorithm, which stores the result in the
+        # `write_property` of every node instead of streaming it, and returns
+        # the summary statistics of the procedure.
+        params["writeProperty"] = write_property
+        row = self._algorithm(lambda tx: tx.run(query, params).single(), access_mode=WRITE_ACCESS)
+        # Node properties changed, but not the topology a projection holds.
+        self.clear_cache()
+        return dict(zip(row.keys(), row.values()))
 
     betweenness_centrality_query = """\
     CALL algo.betweenness.stream({nodeLabel}, {relationshipType}, {
@@ -348,12 +1686,88 @@ class BaseGraph:
     RETURN n.`%s` AS node, centrality
     """
 
-    def betweenness_centrality(self):
-        with self.driver.session() as session:
-            query = self.betweenness_centrality_query % self.identifier_property
+    betweenness_centrality_sampled_query = """\
+    CALL algo.betweenness.sampled.stream({nodeLabel}, {relationshipType}, {
+        strategy: "random",
+        probability: {probability},
+        direction: {direction},
+        graph: {graph}
+    })
+    YIELD nodeId, centrality
+    MATCH (n) WHERE id(n) = nodeId
+    RETURN n.`%s` AS node, centrality * {scale} AS centrality
+    """
+
+    betweenness_centrality_write_query = """\
+    CALL algo.betweenness({nodeLabel}, {relationshipType}, {
+        direction: {direction},
+        graph: {graph},
+        write: true,
+        writeProperty: {writeProperty}
+    })
+    """
+
+    betweenness_centrality_sampled_write_query = """\
+    CALL algo.betweenness.sampled({nodeLabel}, {relationshipType}, {
+        strategy: "random",
+        probability: {probability},
+        direction: {direction},
+        graph: {graph},
+        write: true,
+        writeProperty: {writeProperty}
+    })
+    """
+
+    @instrumented("betweenness_centrality")
+    def betweenness_centrality(self, output=None, k=None, epsilon=None, delta=0.1, time_budget=None,
+                               write_property=None, seed=None):
+        # With `k`, `epsilon` or `time_budget` the centrality is estimated
+        # from the shortest paths of a random sample of source nodes, and
+        # scaled up to estimate the exact values. algo.betweenness.sampled
+        # takes no seed, `seed` is only used by the local backend.
+        if k is None and epsilon is None and time_budget is None:
             params = self.base_params()
-            result = {row["node"]: row["centrality"] for row in session.run(query, params)}
-        return result
+            if write_property is not None:
+                return self._write_back(self.betweenness_centrality_write_query, params, write_property)
+            query = self.betweenness_centrality_query % self.identifier_property
+            return self._scores(query, params, "centrality", output)
+
+        node_count = len(self.nodes)
+        k = _sample_size(node_count, k, epsilon, delta)
+        if time_budget is not None:
+            # A pilot run on a small sample measures the time per source.
+            pilot = min(32, node_count) if k is None else min(32, k, node_count)
+            started = time.monotonic()
+            result = self._sampled_betweenness(pilot, node_count, output, write_property)
+            elapsed = time.monotonic() - started
+            affordable = int(pilot * (time_budget - elapsed) / max(elapsed, 1e-6))
+            k = affordable if k is None else min(k, affordable)
+            if k <= pilot:
+                return result
+        return self._sampled_betweenness(k, node_count, output, write_property)
+
+    def _sampled_betweenness(self, k, node_count, output, write_property=None):
+        params = self.base_params()
+        if k >= node_count:
+            if write_property is not None:
+                return self._write_back(self.betweenness_centrality_write_query, params, write_property)
+            query = self.betweenness_centrality_query % self.identifier_property
+            return self._scores(query, params, "centrality", output)
+        params["probability"] = k / node_count
+        params["scale"] = node_count / k
+        if write_property is not None:
+            # The procedure stores the sums over the sampled sources, which
+            # are scaled into `write_property` like the streamed values.
+            temporary = "nxneo4j-%s" % uuid.uuid4().hex
+            with self.session():
+                try:
+                    summary = self._write_back(self.betweenness_centrality_sampled_write_query, params, temporary)
+                    self._drain_property(temporary, write_property, params["scale"])
+                finally:
+                    self._drain_property(temporary)
+            return summary
+        query = self.betweenness_centrality_sampled_query % self.identifier_property
+        return self._scores(query, params, "centrality", output)
 
     closeness_centrality_query = """\
     CALL algo.closeness.stream({nodeLabel}, {relationshipType}, {
@@ -366,14 +1780,37 @@ class BaseGraph:
     RETURN n.`%s` AS node, centrality
     """
 
-    def closeness_centrality(self, wf_improved=True):
-        with self.driver.session() as session:
+    closeness_centrality_write_query = """\
+    CALL algo.closeness({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      improved: {wfImproved},
+      graph: {graph},
+      write: true,
+      writeProperty: {writeProperty}
+    })
+    """
+
+    @instrumented("closeness_centrality")
+    def closeness_centrality(self, wf_improved=True, output=None, nodes=None, write_property=None):
+        if write_property is not None:
+            if nodes is not None:
+                raise ValueError("write_property stores the centrality of all nodes, it can't be combined with nodes")
             params = self.base_params()
             params["wfImproved"] = wf_improved
-            query = self.closeness_centrality_query % self.identifier_property
+            return self._write_back(self.closeness_centrality_write_query, params, write_property)
+        if nodes is not None:
+            node_count = len(self.nodes) if wf_improved else None
+            rows = [
+                {"node": row["node"], "centrality": _closeness(row, wf_improved, node_count)}
+                for row in self._distance_sums(nodes)
+            ]
+            return _select_scores(rows, "centrality", output)
 
-            result = {row["node"]: row["centrality"] for row in session.run(query, params)}
-        return result
+        params = self.base_params()
+        params["wfImproved"] = wf_improved
+        query = self.closeness_centrality_query % self.identifier_property
+
+        return self._scores(query, params, "centrality", output)
 
     harmonic_centrality_query = """\
     CALL algo.closeness.harmonic.stream({nodeLabel}, {relationshipType}, {
@@ -385,34 +1822,225 @@ class BaseGraph:
     RETURN n.`%s` AS node, centrality
     """
 
-    def harmonic_centrality(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.harmonic_centrality_query % self.identifier_property
-            result = {row["node"]: row["centrality"] for row in session.run(query, params)}
-        return result
+    @instrumented("harmonic_centrality")
+    def harmonic_centrality(self, output=None, nodes=None):
+        if nodes is not None:
+            node_count = len(self.nodes)
+            rows = [
+                {"node": row["node"], "centrality": _harmonic(row, node_count)}
+                for row in self._distance_sums(nodes)
+            ]
+            return _select_scores(rows, "centrality", output)
+
+        params = self.base_params()
+        query = self.harmonic_centrality_query % self.identifier_property
+        return self._scores(query, params, "centrality", output)
+
+    distance_sums_query = """\
+    UNWIND {nodes} AS value
+    MATCH (source:`%s` {`%s`: value })
+    CALL algo.shortestPath.deltaStepping.stream(source, null, 1.0, {
+      nodeQuery: {nodeLabel},
+      relationshipQuery: {relationshipType},
+      direction: {direction},
+      graph: {graph}
+    })
+    YIELD nodeId, distance
+    WITH value, nodeId <> id(source) AND distance < 1.0e308 AS reached, distance
+    RETURN value AS node,
+      count(CASE WHEN reached THEN 1 END) AS reachable,
+      sum(CASE WHEN reached THEN distance ELSE 0.0 END) AS farness,
+      sum(CASE WHEN reached THEN 1.0 / distance ELSE 0.0 END) AS harmonic
+    """
+
+    def _distance_sums(self, nodes):
+        # One single-source search per requested node, aggregated on the
+        # server to one row per node, instead of the all-pairs algorithm.
+        params = self.base_params()
+        params["nodes"] = list(nodes)
+        query = self.distance_sums_query % (self.node_label, self.identifier_property)
+        return self._algorithm(lambda tx: [dict(zip(r.keys(), r.values())) for r in tx.run(query, params)])
 
     pagerank_query = """\
+    UNWIND {sources} AS value
+    OPTIONAL MATCH (source:`%s` {`%s`: value })
+    WITH collect(source) AS sourceNodes
     CALL algo.pageRank.stream({nodeLabel}, {relationshipType}, {
       direction: {direction},
       graph: {graph},
       iterations: {iterations},
-      dampingFactor: {dampingFactor}
+      dampingFactor: {dampingFactor},
+      tolerance: {tolerance},
+      weightProperty: {weight},
+      defaultValue: 1.0,
+      seedProperty: {seedProperty},
+      sourceNodes: sourceNodes
     })
     YIELD nodeId, score
     MATCH (n) WHERE id(n) = nodeId
     RETURN n.`%s` AS node, score
     """
 
-    def pagerank(self, alpha, max_iter):
-        with self.driver.session() as session:
-            params = self.base_params()
-            params["iterations"] = max_iter
-            params["dampingFactor"] = alpha
+    pagerank_write_query = """\
+    UNWIND {sources} AS value
+    OPTIONAL MATCH (source:`%s` {`%s`: value })
+    WITH collect(source) AS sourceNodes
+    CALL algo.pageRank({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      iterations: {iterations},
+      dampingFactor: {dampingFactor},
+      tolerance: {tolerance},
+      weightProperty: {weight},
+      defaultValue: 1.0,
+      seedProperty: {seedProperty},
+      sourceNodes: sourceNodes,
+      write: true,
+      writeProperty: {writeProperty}
+    })
+    YIELD nodes, iterations, loadMillis, computeMillis, writeMillis
+    RETURN nodes, iterations, loadMillis, computeMillis, writeMillis
+    """
 
-            query = self.pagerank_query % self.identifier_property
-            result = {row["node"]: row["score"] for row in session.run(query, params)}
-        return result
+    @instrumented("pagerank")
+    def pagerank(self, alpha, max_iter, output=None, tol=None, weight=None, nstart=None, personalization=None,
+                 write_property=None):
+        # `nstart` is the name of a node property holding the scores to
+        # start from, or a dict of them, which is stored in a temporary
+        # property for the run. Seeds are read from the stored graph, so a
+        # loaded projection is not used then. `personalization` restarts the
+        # random walk at its nodes; the procedure weighs them uniformly.
+        params = self._pagerank_params(alpha, max_iter, tol, weight, nstart is None)
+        params["sources"] = _personalization_sources(personalization)
+        if write_property is not None:
+            query = self.pagerank_write_query % (self.node_label, self.identifier_property)
+            run = lambda: self._write_back(query, params, write_property)
+        else:
+            query = self.pagerank_query % (self.node_label, self.identifier_property, self.identifier_property)
+            run = lambda: self._scores(query, params, "score", output)
+        if not isinstance(nstart, dict):
+            params["seedProperty"] = nstart
+            return run()
+
+        params["seedProperty"] = "nxneo4j-seed-%s" % uuid.uuid4().hex
+        with self.session():
+            self._set_property(params["seedProperty"], nstart.items())
+            try:
+                return run()
+            finally:
+                self._remove_property(params["seedProperty"], nstart)
+
+    def _pagerank_params(self, alpha, max_iter, tol, weight, use_projection=True):
+        params = self.base_params(weight, use_projection)
+        params["iterations"] = max_iter
+        params["dampingFactor"] = alpha
+        params["tolerance"] = tol
+        params["weight"] = weight
+        params["seedProperty"] = None
+        return params
+
+    personalized_pagerank_query = """\
+    UNWIND range(0, size({sourceSets}) - 1) AS sourceSet
+    OPTIONAL MATCH (source:`%s`)
+    WHERE source.`%s` IN {sourceSets}[sourceSet]
+    WITH sourceSet, collect(source) AS sourceNodes
+    CALL algo.pageRank.stream({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      iterations: {iterations},
+      dampingFactor: {dampingFactor},
+      tolerance: {tolerance},
+      weightProperty: {weight},
+      defaultValue: 1.0,
+      sourceNodes: sourceNodes
+    })
+    YIELD nodeId, score
+    MATCH (n) WHERE id(n) = nodeId
+    RETURN sourceSet, n.`%s` AS node, score
+    """
+
+    @instrumented("personalized_pagerank")
+    def personalized_pagerank(self, personalizations, alpha=0.85, max_iter=100, tol=None, weight=None, output=None):
+        # Runs one personalized PageRank per entry of `personalizations`
+        # in a single query and returns their results in the same order.
+        # Every run reuses the loaded projection; without one, several runs
+        # share a projection loaded for the call instead of each projecting
+        # the graph again.
+        if output is not None:
+            _check_output(output)
+        personalizations = list(personalizations)
+        if self._projection is None and len(personalizations) > 1:
+            with self.projection(weight=weight):
+                return self.personalized_pagerank(personalizations, alpha, max_iter, tol, weight, output)
+        params = self._pagerank_params(alpha, max_iter, tol, weight)
+        params["sourceSets"] = [_personalization_sources(p) for p in personalizations]
+        query = self.personalized_pagerank_query % (
+            self.node_label,
+            self.identifier_property,
+            self.identifier_property
+        )
+
+        def run(tx):
+            rows = [[] for _ in params["sourceSets"]]
+            for row in tx.run(query, params):
+                rows[row["sourceSet"]].append(row)
+            return rows
+
+        return [_select_scores(rows, "score", output) for rows in self._algorithm(run)]
+
+    set_property_query = """\
+    UNWIND {values} AS row
+    MATCH (n:`%s` {`%s`: row[0] })
+    SET n.`%s` = row[1]
+    """
+
+    remove_property_query = """\
+    UNWIND {values} AS value
+    MATCH (n:`%s` {`%s`: value })
+    REMOVE n.`%s`
+    """
+
+    def _set_property(self, name, items, batch_size=10000):
+        # Temporary properties don't change what the graph reads, so they
+        # don't go through _write and leave caches and projections intact.
+        query = self.set_property_query % (self.node_label, self.identifier_property, name)
+        for batch in _chunks(([k, v] for k, v in items), batch_size):
+            self._execute(WRITE_ACCESS, lambda tx: tx.run(query, {"values": batch}).consume())
+
+    def _remove_property(self, name, nodes, batch_size=10000):
+        query = self.remove_property_query % (self.node_label, self.identifier_property, name)
+        for batch in _chunks(nodes, batch_size):
+            self._execute(WRITE_ACCESS, lambda tx: tx.run(query, {"values": batch}).consume())
+
+    drain_property_query = """\
+    MATCH (n:`%s`)
+    WHERE exists(n.`%s`)
+    WITH n LIMIT {limit}
+    REMOVE n.`%s`
+    RETURN count(n) AS count
+    """
+
+    move_property_query = """\
+    MATCH (n:`%s`)
+    WHERE exists(n.`%s`)
+    WITH n LIMIT {limit}
+    SET n.`%s` = n.`%s` * {scale}
+    REMOVE n.`%s`
+    RETURN count(n) AS count
+    """
+
+    def _drain_property(self, name, target=None, scale=1, batch_size=10000):
+        # Removes the temporary property `name` from all nodes, at most
+        # `batch_size` per transaction, after storing it times `scale` in
+        # `target`.
+        if target is None:
+            query = self.drain_property_query % (self.node_label, name, name)
+        else:
+            query = self.move_property_query % (self.node_label, name, target, name, name)
+        params = {"limit": batch_size, "scale": scale}
+        while self._execute(WRITE_ACCESS, lambda tx: tx.run(query, params).single()["count"]) == batch_size:
+            pass
+        self.clear_cache()
 
     triangle_count_query = """\
     CALL algo.triangleCount.stream({nodeLabel}, {relationshipType}, {
@@ -424,19 +2052,82 @@ class BaseGraph:
     RETURN n.`%s` AS node, triangles, coefficient
     """
 
-    def triangles(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.triangle_count_query % self.identifier_property
-            result = {row["node"]: row["triangles"] for row in session.run(query, params)}
-        return result
+    triangle_count_write_query = """\
+    CALL algo.triangleCount({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      write: true,
+      writeProperty: {writeProperty},
+      clusteringCoefficientProperty: {coefficientProperty}
+    })
+    """
 
-    def clustering(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.triangle_count_query % self.identifier_property
-            result = {row["node"]: row["coefficient"] for row in session.run(query, params)}
-        return result
+    def _write_triangles(self, triangles_property, coefficient_property):
+        # The procedure writes the triangle counts and the clustering
+        # coefficients together; the one without a property goes to a
+        # temporary property that is removed again.
+        params = self.base_params()
+        temporary = "nxneo4j-%s" % uuid.uuid4().hex
+        params["coefficientProperty"] = coefficient_property or temporary
+        with self.session():
+            try:
+                return self._write_back(self.triangle_count_write_query, params, triangles_property or temporary)
+            finally:
+                self._drain_property(temporary)
+
+    @instrumented("triangles")
+    def triangles(self, output=None, nodes=None, write_property=None, coefficient_property=None):
+        # The write mode stores the clustering coefficient as well if
+        # `coefficient_property` is given.
+        if write_property is not None:
+            return self._write_triangles(write_property, coefficient_property)
+        if nodes is not None:
+            return self._node_triangles(nodes, "triangles", output)
+        params = self.base_params()
+        query = self.triangle_count_query % self.identifier_property
+        return self._scores(query, params, "triangles", output, int)
+
+    @instrumented("clustering")
+    def clustering(self, output=None, nodes=None, write_property=None, triangles_property=None):
+        # The write mode stores the triangle counts as well if
+        # `triangles_property` is given.
+        if write_property is not None:
+            return self._write_triangles(triangles_property, write_property)
+        if nodes is not None:
+            return self._node_triangles(nodes, "coefficient", output)
+        params = self.base_params()
+        query = self.triangle_count_query % self.identifier_property
+        return self._scores(query, params, "coefficient", output)
+
+    node_triangles_query = """\
+    UNWIND {nodes} AS value
+    MATCH (n:`%s` {`%s`: value })
+    OPTIONAL MATCH (n)-[:`%s`]-(m:`%s`)
+    WHERE m <> n
+    WITH value, n, count(DISTINCT m) AS degree
+    OPTIONAL MATCH (n)-[:`%s`]-(a:`%s`)-[:`%s`]-(b:`%s`)-[:`%s`]-(n)
+    WHERE id(a) < id(b) AND a <> n AND b <> n
+    WITH value, degree, count(DISTINCT CASE WHEN a IS NULL THEN NULL ELSE [id(a), id(b)] END) AS triangles
+    RETURN value AS node, triangles,
+      CASE WHEN degree < 2 THEN 0.0 ELSE 2.0 * triangles / (degree * (degree - 1)) END AS coefficient
+    """
+
+    def _node_triangles(self, nodes, value, output):
+        # Counts the triangles around each requested node with a local
+        # traversal, so the cost depends on their neighborhoods only.
+        label = self.node_label
+        relationship_type = self.relationship_type
+        query = self.node_triangles_query % (
+            label, self.identifier_property,
+            relationship_type, label,
+            relationship_type, label, relationship_type, label, relationship_type
+        )
+        params = {"nodes": list(nodes)}
+        if output is None:
+            return self._read(lambda tx: {row["node"]: row[value] for row in tx.run(query, params)})
+        _check_output(output)
+        dtype = int if value == "triangles" else float
+        return self._read(lambda tx: _columns(tx.run(query, params), "node", value, output, dtype))
 
     triangle_query = """\
     CALL algo.triangleCount({nodeLabel}, {relationshipType}, {
@@ -446,12 +2137,11 @@ class BaseGraph:
     })
     """
 
+    @instrumented("average_clustering")
     def average_clustering(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.triangle_query
-            result = session.run(query, params)
-            return result.peek()["averageClusteringCoefficient"]
+        params = self.base_params()
+        query = self.triangle_query
+        return self._algorithm(lambda tx: tx.run(query, params).single()["averageClusteringCoefficient"], access_mode=WRITE_ACCESS)
 
     lpa_query = """\
     CALL algo.labelPropagation.stream({nodeLabel}, {relationshipType}, {
@@ -463,13 +2153,49 @@ class BaseGraph:
     RETURN label, collect(n.`%s`) AS nodes
     """
 
-    def label_propagation(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.lpa_query % self.identifier_property
+    lpa_write_query = """\
+    CALL algo.labelPropagation({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      write: true,
+      writeProperty: {writeProperty}
+    })
+    """
+
+    lpa_membership_query = """\
+    CALL algo.labelPropagation.stream({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph}
+    })
+    YIELD nodeId, label
+    MATCH (n) WHERE id(n) = nodeId
+    RETURN n.`%s` AS node, label AS community
+    """
 
-            for row in session.run(query, params):
-                yield set(row["nodes"])
+    @instrumented("label_propagation")
+    def label_propagation(self, output=None, write_property=None):
+        params = self.base_params()
+        if write_property is not None:
+            return self._write_back(self.lpa_write_query, params, write_property)
+        if output is not None:
+            return self._membership(self.lpa_membership_query % self.identifier_property, params, output)
+        return self._communities(self.lpa_query % self.identifier_property, params)
+
+    def _communities(self, query, params):
+        for row in self._stream(query, params, self._algorithm_access_mode()):
+            yield set(row["nodes"])
+
+    def _membership(self, query, params, output):
+        # output="pairs" streams (node, community) tuples, so memory doesn't
+        # grow with the size of the largest community.
+        if output == "pairs":
+            return self._pairs(query, params)
+        _check_output(output)
+        return self._algorithm(lambda tx: _columns(tx.run(query, params), "node", "community", output, int))
+
+    def _pairs(self, query, params):
+        for row in self._stream(query, params, self._algorithm_access_mode()):
+            yield row["node"], row["community"]
 
     shortest_path_query = """\
     MATCH (source:`%s` {`%s`: {source} })
@@ -483,41 +2209,189 @@ class BaseGraph:
     RETURN n.`%s` AS node, cost
     """
 
+    @instrumented("shortest_weighted_path")
     def shortest_weighted_path(self, source, target, weight):
-        with self.driver.session() as session:
-            params = self.base_params()
-            params["source"] = source
-            params["target"] = target
-            params["propertyName"] = weight
-
-            query = self.shortest_path_query % (
-                self.node_label,
-                self.identifier_property,
-                self.node_label,
-                self.identifier_property,
-                self.identifier_property
-            )
-
-            result = [row["node"] for row in session.run(query, params)]
+        params = self.base_params(weight)
+        params["source"] = source
+        params["target"] = target
+        params["propertyName"] = weight
+
+        query = self.shortest_path_query % (
+            self.node_label,
+            self.identifier_property,
+            self.node_label,
+            self.identifier_property,
+            self.identifier_property
+        )
+
+        result = self._algorithm(lambda tx: [row["node"] for row in tx.run(query, params)])
         return result
 
+    @instrumented("shortest_path")
     def shortest_path(self, source, target):
-        with self.driver.session() as session:
-            params = self.base_params()
-            params["source"] = source
-            params["target"] = target
-            params["propertyName"] = None
+        params = self.base_params()
+        params["source"] = source
+        params["target"] = target
+        params["propertyName"] = None
+
+        query = self.shortest_path_query % (
+            self.node_label,
+            self.identifier_property,
+            self.node_label,
+            self.identifier_property,
+            self.identifier_property
+        )
+
+        result = self._algorithm(lambda tx: [row["node"] for row in tx.run(query, params)])
+        return result
 
-            query = self.shortest_path_query % (
-                self.node_label,
-                self.identifier_property,
-                self.node_label,
-                self.identifier_property,
-                self.identifier_property
-            )
+    @instrumented("single_source_shortest_path")
+    def single_source_shortest_path(self, source, cutoff=None, reverse=False):
+        # Level synchronous breadth-first search: the neighbors of a whole
+        # level are fetched in one round trip per 10000 nodes, and the paths
+        # to its nodes are yielded as (node, path) before the next level is
+        # fetched. With `reverse` the paths lead from every node to `source`.
+        # Every chunk is read completely before its paths are yielded, and
+        # no session is bound while the caller runs between two items.
+        direction = _REVERSE[self.direction] if reverse else self.direction
+        adj = AdjacencyView(self, direction)
+        predecessors = {source: None}
+        frontier = [source]
+        depth = 0
+        if source not in self:
+            raise NodeNotFound("Source %s is not in G" % (source, ))
+        yield source, [source]
+        while frontier and (cutoff is None or depth < cutoff):
+            depth += 1
+            level = []
+            for chunk in _chunks(frontier, 10000):
+                for u, neighbors in adj.neighbors(chunk).items():
+                    for v in neighbors:
+                        if v not in predecessors:
+                            predecessors[v] = u
+                            level.append(v)
+                            yield v, _path(predecessors, v, reverse)
+            frontier = level
+
+    single_source_dijkstra_query = """\
+    MATCH (source:`%s` {`%s`: {source} })
+    CALL algo.shortestPath.deltaStepping.stream(source, {propertyName}, {delta}, {
+      nodeQuery: {nodeLabel},
+      relationshipQuery: {relationshipType},
+      defaultValue: 1.0,
+      direction: {direction},
+      graph: {graph}
+    })
+    YIELD nodeId, distance
+    WITH nodeId, distance
+    WHERE distance < 1.0e308 AND ({cutoff} IS NULL OR distance <= {cutoff})
+    MATCH (n) WHERE id(n) = nodeId
+    RETURN n.`%s` AS node, distance,
+      [(n)%s[edge:`%s`]%s(u:`%s`) | [u.`%s`, coalesce(edge[{propertyName}], 1.0)]] AS predecessors
+    ORDER BY distance
+    """
 
-            result = [row["node"] for row in session.run(query, params)]
-        return result
+    @instrumented("single_source_dijkstra_path")
+    def single_source_dijkstra_path(self, source, weight="weight", cutoff=None, reverse=False, delta=1.0):
+        # The distances come from the delta-stepping procedure in ascending
+        # order, together with the relationships into every node. A node's
+        # predecessor is the neighbor on a shortest path to it, so the
+        # paths are rebuilt while the rows stream in. `cutoff` bounds the
+        # distance on the server.
+        direction = _REVERSE[self.direction] if reverse else self.direction
+        params = self.base_params(weight)
+        params.update({
+            "source": source,
+            "propertyName": weight,
+            "delta": delta,
+            "cutoff": cutoff,
+            "direction": direction
+        })
+        left, right = _ARROWS[_REVERSE[direction]]
+        query = self.single_source_dijkstra_query % (
+            self.node_label,
+            self.identifier_property,
+            self.identifier_property,
+            left,
+            self.relationship_type,
+            right,
+            self.node_label,
+            self.identifier_property
+        )
+
+        distances = {}
+        predecessors = {}
+        # Rows that wait for a neighbor, by that neighbor; a node is retried
+        # once one of its unsettled neighbors is settled. `closest` holds
+        # the best settled neighbor found so far for waiting nodes.
+        pending = {}
+        waiting = {}
+        closest = []
+        counter = itertools.count()
+
+        def wait(row):
+            v = row["node"]
+            pending[v] = row
+            best = _closest(v, row["predecessors"], distances, predecessors)
+            if best is not None and best[0] <= best[2]:
+                heapq.heappush(closest, (best[0], next(counter), v, best[1]))
+
+        def settled(v):
+            yield v, _path(predecessors, v, reverse)
+            stack = [v]
+            while stack:
+                for row in waiting.pop(stack.pop(), ()):
+                    w = row["node"]
+                    if w not in pending:
+                        continue
+                    if _settle(w, row["predecessors"], distances, predecessors):
+                        del pending[w]
+                        stack.append(w)
+                        yield w, _path(predecessors, w, reverse)
+                    else:
+                        wait(row)
+
+        for row in self._stream(query, params, self._algorithm_access_mode()):
+            v = row["node"]
+            distances[v] = row["distance"]
+            if v == source:
+                predecessors[v] = None
+                yield from settled(v)
+            elif _settle(v, row["predecessors"], distances, predecessors):
+                yield from settled(v)
+            else:
+                wait(row)
+                for u, _ in row["predecessors"]:
+                    if u not in predecessors:
+                        waiting.setdefault(u, []).append(row)
+        # Nodes tied over relationships of weight 0 can wait for each other,
+        # the one that comes closest to a settled path goes first.
+        while pending:
+            if not closest:
+                raise NetworkXError("The distance of %s matches none of its relationships" % (next(iter(pending)), ))
+            _, _, v, u = heapq.heappop(closest)
+            if v in pending:
+                predecessors[v] = u
+                del pending[v]
+                yield from settled(v)
+        if not distances and source not in self:
+            raise NodeNotFound("Source %s is not in G" % (source, ))
+
+    @instrumented("all_pairs_shortest_path")
+    def all_pairs_shortest_path(self, weight=None, cutoff=None):
+        # Yields (source, {target: path}) for one source after the other,
+        # so only the paths of a single source are held in memory. The
+        # weighted paths share one projection of the graph, which stays
+        # loaded until the generator is exhausted or closed.
+        if weight is not None and self._projection is None:
+            with self.projection(weight=weight):
+                yield from self.all_pairs_shortest_path(weight, cutoff)
+            return
+        for source in self.nodes:
+            if weight is None:
+                yield source, dict(self.single_source_shortest_path(source, cutoff))
+            else:
+                yield source, dict(self.single_source_dijkstra_path(source, weight, cutoff))
 
     connected_components_query = """\
     CALL algo.unionFind.stream({nodeLabel}, {relationshipType}, {
@@ -529,15 +2403,79 @@ class BaseGraph:
     RETURN setId, collect(n.`%s`) AS nodes
     """
 
-    def connected_components(self):
-        with self.driver.session() as session:
-            params = self.base_params()
-            query = self.lpa_query % self.identifier_property
+    connected_components_write_query = """\
+    CALL algo.unionFind({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      write: true,
+      writeProperty: {writeProperty}
+    })
+    """
 
-            for row in session.run(query, params):
-                yield set(row["nodes"])
+    connected_components_membership_query = """\
+    CALL algo.unionFind.stream({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph}
+    })
+    YIELD nodeId, setId
+    MATCH (n) WHERE id(n) = nodeId
+    RETURN n.`%s` AS node, setId AS community
+    """
+
+    @instrumented("connected_components")
+    def connected_components(self, output=None, write_property=None):
+        params = self.base_params()
+        if write_property is not None:
+            return self._write_back(self.connected_components_write_query, params, write_property)
+        if output is not None:
+            query = self.connected_components_membership_query % self.identifier_property
+            return self._membership(query, params, output)
+        return self._communities(self.connected_components_query % self.identifier_property, params)
+
+    connected_component_sizes_query = """\
+    CALL algo.unionFind.stream({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph}
+    })
+    YIELD setId
+    RETURN setId AS community, count(*) AS size
+    """
+
+    @instrumented("connected_component_sizes")
+    def connected_component_sizes(self, output=None):
+        params = self.base_params()
+        query = self.connected_component_sizes_query
+        if output is None:
+            return self._algorithm(lambda tx: {row["community"]: row["size"] for row in tx.run(query, params)})
+        _check_output(output)
+        return self._algorithm(lambda tx: _columns(tx.run(query, params), "community", "size", output, int))
+
+    number_connected_components_query = """\
+    CALL algo.unionFind({nodeLabel}, {relationshipType}, {
+      direction: {direction},
+      graph: {graph},
+      write: false
+    })
+    """
 
-    def base_params(self):
+    @instrumented("number_connected_components")
+    def number_connected_components(self):
+        params = self.base_params()
+        query = self.number_connected_components_query
+        return self._algorithm(lambda tx: tx.run(query, params).single()["setCount"], access_mode=WRITE_ACCESS)
+
+    def base_params(self, weight=None, use_projection=True):
+        projection = self._projection if use_projection else None
+        if projection is not None and weight in (None, projection["weight"]):
+            if projection["stale"]:
+                self.load(projection["name"], projection["weight"])
+            # Label and relationship type are taken from the named graph.
+            return {
+                "direction": self.direction,
+                "nodeLabel": None,
+                "relationshipType": None,
+                "graph": projection["name"]
+            }
         return {
             "direction": self.direction,
             "nodeLabel": self.node_label,
@@ -0,0 +1,134 @@
+import time
+from networkx.exception import NetworkXError
+from nxneo4j.instrumentation import instrumented
+
+
+class _Group:
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows = []
+        self.keys = set()
+
+
+class WriteBatch:
+    # Buffers add_node, add_edge and remove_node calls made on a graph inside
+    # `with G.batch():` and writes them as one UNWIND statement per group of
+    # mutations of the same kind.
+    #
+    # A mutation joins the latest group of its kind unless a later group
+    # touches one of its nodes; mutations on disjoint nodes commute, so the
+    # result is the same as running every call one at a time. Reads inside
+    # the block don't see mutations that have not been flushed yet.
+
+    remove_nodes_query = """\
+    UNWIND {values} AS value
+    OPTIONAL MATCH (n:`%s` {`%s`: value })
+    DETACH DELETE n
+    RETURN value, count(n) AS deletedNodes
+    """
+
+    def __init__(self, graph, max_size=10000, max_delay=None):
+        self.graph = graph
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._groups = []
+        self._size = 0
+        self._started = None
+
+    def __len__(self):
+        return self._size
+
+    def add_node(self, value, props):
+        props = dict(props)
+        props[self.graph.identifier_property] = value
+        self._add("node", props, {value})
+
+    def add_edge(self, node1, node2, props):
+        self._add("edge", [node1, node2, props], {node1, node2})
+
+    def remove_node(self, n):
+        self._add("remove", n, {n})
+
+    def _add(self, kind, row, keys):
+        group = None
+        for g in reversed(self._groups):
+            if g.kind == kind:
+                group = g
+                break
+            if not g.keys.isdisjoint(keys):
+                break
+        if group is None:
+            group = _Group(kind)
+            self._groups.append(group)
+        group.rows.append(row)
+        group.keys |= keys
+
+        self._size += 1
+        if self._started is None:
+            self._started = time.monotonic()
+        # The time threshold is checked when mutations are added, there is
+        # no background flushing.
+        if self._size >= self.max_size or (
+                self.max_delay is not None and
+                time.monotonic() - self._started >= self.max_delay):
+            self.flush()
+
+    def discard(self):
+        self._groups = []
+        self._size = 0
+        self._started = None
+
+    @instrumented("WriteBatch.flush")
+    def flush(self):
+        graph = self.graph
+        groups = self._groups
+        self.discard()
+        if not groups:
+            return
+
+        # All groups are written in one transaction, which is retried as a
+        # whole on transient errors. Removing a missing node fails it, so
+        # none of the groups are written then.
+        try:
+            graph._write(self._write_groups, groups)
+        finally:
+            if any(group.kind == "remove" for group in groups):
+                graph._forget()
+
+    def _write_groups(self, tx, groups):
+        graph = self.graph
+        missing = []
+        for group in groups:
+            if group.kind == "node":
+                query = graph.add_nodes_query_with_attrdict % (
+                    graph.node_label,
+                    graph.identifier_property,
+                    graph.identifier_property
+                )
+                tx.run(query, {"values": group.rows}).consume()
+            elif group.kind == "edge":
+                query = graph.add_edges_query % (
+                    graph.node_label,
+                    graph.identifier_property,
+                    graph.node_label,
+                    graph.identifier_property,
+                    graph.relationship_type
+                )
+                tx.run(query, {"edges": group.rows}).consume()
+            else:
+                # Removing a node twice within a group fails the second
+                # time, exactly like two remove_node calls would.
+                values = []
+                seen = set()
+                for n in group.rows:
+                    if n in seen:
+                        missing.append(n)
+                    else:
+                        seen.add(n)
+                        values.append(n)
+                query = self.remove_nodes_query % (graph.node_label, graph.identifier_property)
+                for row in tx.run(query, {"values": values}):
+                    if row["deletedNodes"] < 1:
+                        missing.append(row["value"])
+        if missing:
+            raise NetworkXError("The nodes %s are not in the graph." % (missing, ))
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    # Bounded LRU cache for the results of small reads, such as node
+    # lookups, membership tests and counts. Entries expire `ttl` seconds
+    # after they were stored, or never if `ttl` is None.
+    #
+    # Every clear() starts a new generation; a value loaded while the cache
+    # was cleared is not stored, since it may predate the write that caused
+    # the clear.
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def get_many(self, keys):
+        # The values of the `keys` that are cached, under one lock.
+        found = {}
+        with self._lock:
+            now = time.monotonic() if self.ttl is not None else None
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                value, expires = entry
+                if expires is not None and now >= expires:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def put(self, key, value, generation=None):
+        self.put_many([(key, value)], generation)
+
+    def put_many(self, items, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            for key, value in items:
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
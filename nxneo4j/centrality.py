@@ -1,31 +1,57 @@
+from nxneo4j import utils
+
+
 def betweenness_centrality(G, k=None, normalized=True, weight=None,
-                           endpoints=False, seed=None):
-    # doesn't currently support `weight`, `k`, `endpoints`, `seed`
-    return G.betweenness_centrality()
+                           endpoints=False, seed=None, output=None,
+                           epsilon=None, delta=0.1, time_budget=None,
+                           write_property=None, backend=None):
+    # doesn't currently support `weight`, `endpoints`; the server draws
+    # the `k` sample sources without a seed, only the local backend uses
+    # `seed`. `epsilon`/`delta` and `time_budget` (seconds) pick the sample
+    # size instead of `k`.
+    # With `write_property` the centralities are stored on the nodes and
+    # only the summary of the procedure is returned; the local backend
+    # doesn't support it.
+    # backend="local" computes it on a snapshot of G, split across a
+    # process pool, see utils.backend.
+    return utils.backend(G, backend).betweenness_centrality(
+        output=output, k=k, epsilon=epsilon, delta=delta,
+        time_budget=time_budget, write_property=write_property, seed=seed)
 
 
 def closeness_centrality(G, u=None, distance=None,
-                         wf_improved=True, reverse=False):
+                         wf_improved=True, reverse=False, output=None,
+                         write_property=None, backend=None):
     # doesn't currently supported `distance`, `reverse`
-    centralities = G.closeness_centrality(wf_improved)
-
-    if u:
+    G = utils.backend(G, backend)
+    if u is not None:
+        centralities = G.closeness_centrality(wf_improved, nodes=[u])
         return centralities[u]
 
-    return centralities
+    return G.closeness_centrality(wf_improved, output=output, write_property=write_property)
 
 
-def harmonic_centrality(G, nbunch=None, distance=None):
+def harmonic_centrality(G, nbunch=None, distance=None, output=None, backend=None):
     # doesn't currently support `distance`
-    centralities = G.harmonic_centrality()
-
-    if nbunch:
-        return {k: v for k, v in centralities.items() if k in nbunch}
-
-    return centralities
+    return utils.backend(G, backend).harmonic_centrality(output=output, nodes=nbunch)
 
 
 def pagerank(G, alpha=0.85, personalization=None,
-             max_iter=100, tol=1.0e-8, nstart=None, weight='weight'):
-    # doesn't currently supported `personalization`, `tol`, `nstart`, `weight`
-    return G.pagerank(alpha, max_iter)
+             max_iter=100, tol=1.0e-8, nstart=None, weight=None, output=None,
+             write_property=None, backend=None):
+    # `personalization` only selects the nodes to restart at, their weights
+    # are ignored. `nstart` may also name a node property with the scores,
+    # for example the `write_property` of a previous run. Unlike networkx,
+    # `weight` defaults to None, like in the other functions, so that a
+    # projection loaded without a weight is used.
+    return utils.backend(G, backend, weight).pagerank(
+        alpha, max_iter, output=output, tol=tol, weight=weight,
+        nstart=nstart, personalization=personalization,
+        write_property=write_property)
+
+
+def personalized_pagerank(G, personalizations, alpha=0.85, max_iter=100,
+                          tol=1.0e-8, weight=None, output=None, backend=None):
+    # One PageRank per personalization, computed in a single call.
+    return utils.backend(G, backend, weight).personalized_pagerank(
+        personalizations, alpha, max_iter, tol=tol, weight=weight, output=output)
@@ -1,34 +1,39 @@
-def triangles(G, nodes=None):
-    triangles = G.triangles()
+from nxneo4j import utils
 
-    if nodes:
-        return {k: v for k, v in triangles.items() if k in nodes}
 
-    return triangles
+def triangles(G, nodes=None, output=None, write_property=None, coefficient_property=None, backend=None):
+    return utils.backend(G, backend).triangles(output=output, nodes=nodes, write_property=write_property,
+                                               coefficient_property=coefficient_property)
 
 
-def clustering(G, nodes=None, weight=None):
+def clustering(G, nodes=None, weight=None, output=None, write_property=None, triangles_property=None,
+               backend=None):
     # doesn't currently support `weight`
-    triangles = G.triangles()
+    return utils.backend(G, backend).clustering(output=output, nodes=nodes, write_property=write_property,
+                                                triangles_property=triangles_property)
 
-    if nodes:
-        return {k: v for k, v in triangles.items() if k in nodes}
 
-    return G.clustering()
+def average_clustering(G, nodes=None, weight=None, count_zeros=True, backend=None):
+    # doesn't currently support `nodes`, `weight`, `count_zeros`
+    return utils.backend(G, backend).average_clustering()
 
 
-def average_clustering(G, nodes=None, weight=None, count_zeros=True):
-    # doesn't currently support `nodes`, `weight`, `count_zeros`
-    return G.average_clustering()
+def label_propagation_communities(G, output=None, write_property=None, backend=None):
+    # With output="numpy"/"pandas" the node -> community membership is
+    # returned as columns instead of a generator of sets, output="pairs"
+    # streams it as (node, community) tuples and with `write_property` it is
+    # stored on the nodes.
+    return utils.backend(G, backend).label_propagation(output=output, write_property=write_property)
 
 
-def label_propagation_communities(G):
-    return G.label_propagation()
+def connected_components(G, output=None, write_property=None, backend=None):
+    return utils.backend(G, backend).connected_components(output=output, write_property=write_property)
 
 
-def connected_components(G):
-    return G.connected_components()
+def connected_component_sizes(G, output=None, backend=None):
+    # {community: size}, without shipping the members of the components.
+    return utils.backend(G, backend).connected_component_sizes(output=output)
 
 
-def number_connected_components(G):
-    return sum(1 for cc in connected_components(G))
+def number_connected_components(G, backend=None):
+    return utils.backend(G, backend).number_connected_components()
@@ -0,0 +1,107 @@
+import networkx as nx
+
+nodes_query = """\
+MATCH (node:`%s`)
+RETURN node.`%s` AS node, %s AS data
+"""
+
+edges_query = """\
+MATCH (u:`%s`)-[edge:`%s`]->(v:`%s`)
+RETURN u.`%s` AS u, v.`%s` AS v, %s AS data
+"""
+
+
+def _projection(variable, attributes):
+    # The Cypher expression for the data of a node or relationship: all of
+    # its properties, none, or only those named in `attributes`.
+    if attributes is True:
+        return "properties(%s)" % variable
+    if not attributes:
+        return "null"
+    return "[key IN {keys} | [key, %s[key]]]" % variable
+
+
+def _data(data, attributes, exclude=None):
+    if attributes is True:
+        return {k: v for k, v in data.items() if k != exclude}
+    if not attributes:
+        return {}
+    return {k: v for k, v in data if v is not None}
+
+
+def to_networkx(G, node_attributes=True, edge_attributes=True, create_using=None):
+    # Copies G into a networkx graph, a DiGraph for a DiGraph, with one
+    # streamed query for the nodes and one for the relationships. The
+    # attributes are all properties, none with False, or only the named
+    # ones with a list; the projection happens on the server.
+    if create_using is None:
+        create_using = nx.Graph if G.direction == "BOTH" else nx.DiGraph
+    H = nx.empty_graph(0, create_using)
+    key = G.identifier_property
+
+    query = nodes_query % (G.node_label, key, _projection("node", node_attributes))
+    rows = G._stream(query, {"keys": node_attributes})
+    H.add_nodes_from((row["node"], _data(row["data"], node_attributes, key)) for row in rows)
+
+    if G.relationship_type is not None:
+        query = edges_query % (
+            G.node_label, G.relationship_type, G.node_label, key, key,
+            _projection("edge", edge_attributes)
+        )
+        rows = G._stream(query, {"keys": edge_attributes})
+        H.add_edges_from((row["u"], row["v"], _data(row["data"], edge_attributes)) for row in rows)
+    return H
+
+
+def from_networkx(graph, G, batch_size=10000, progress=None, graph_id_props=None):
+    # Writes the nodes and then the edges of the networkx `graph` into G,
+    # `batch_size` per transaction; `progress` is called as in
+    # add_nodes_from, first for the nodes and then for the edges.
+    #
+    # A node is stored under the value of its identifier property if its
+    # data has one, else under the networkx node. `graph_id_props` names
+    # properties to store the networkx node in, one per item of a tuple
+    # node. The identifier of each node is resolved once, while its data is
+    # read, and looked up for the edges.
+    renamed = {}
+    nodes = _nodes(graph, G.identifier_property, graph_id_props, renamed)
+    G.add_nodes_from(nodes, batch_size=batch_size, progress=progress)
+    G.add_edges_from(_edges(graph, renamed), batch_size=batch_size, progress=progress)
+    return G
+
+
+def _nodes(graph, key, graph_id_props, renamed):
+    # Yields the identifier and the properties of every node of `graph`,
+    # and records the nodes stored under another identifier in `renamed`.
+    for n, d in graph.nodes(data=True):
+        d = dict(d)
+        if graph_id_props is not None:
+            if isinstance(graph_id_props, (tuple, list)):
+                d.update(zip(graph_id_props, n))
+            else:
+                d[graph_id_props] = n
+        if key in d and d[key] != n:
+            renamed[n] = d[key]
+            n = d[key]
+        yield n, d
+
+
+def _edges(graph, renamed):
+    for u, v, d in graph.edges(data=True):
+        yield renamed.get(u, u), renamed.get(v, v), d
+
+
+def _stored(value):
+    # The value as the database returns it once stored: tuples come back as
+    # lists and NumPy scalars and arrays as Python values.
+    if isinstance(value, (list, tuple)):
+        return [_stored(v) for v in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def _fingerprint(data):
+    # A hash of the properties, to compare the two sides of a sync without
+    # keeping the properties. It only needs to be stable within a process.
+    return hash(repr(sorted((k, _stored(v)) for k, v in data.items())))
@@ -1,6 +1,34 @@
-from nxneo4j.base_graph import BaseGraph
+from nxneo4j.base_graph import BaseGraph, AdjacencyView, DegreeView
 
 
 class DiGraph(BaseGraph):
     def __init__(self, driver, config=None):
         BaseGraph.__init__(self, driver, "OUTGOING", config)
+
+    @property
+    def succ(self):
+        return self.adj
+
+    @property
+    def pred(self):
+        pred = AdjacencyView(self, "INCOMING")
+        self.__dict__["pred"] = pred
+        return pred
+
+    @property
+    def in_degree(self):
+        in_degree = DegreeView(self, "INCOMING")
+        self.__dict__["in_degree"] = in_degree
+        return in_degree
+
+    @property
+    def out_degree(self):
+        out_degree = DegreeView(self, "OUTGOING")
+        self.__dict__["out_degree"] = out_degree
+        return out_degree
+
+    def successors(self, n):
+        return self.neighbors(n)
+
+    def predecessors(self, n):
+        return iter(self.pred.neighbors([n])[n])
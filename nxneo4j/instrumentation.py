@@ -0,0 +1,276 @@
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+
+# Listeners registered for every graph; graphs have their own list too, see
+# BaseGraph.instrument. A listener is called with a finished Operation.
+_listeners = []
+_local = threading.local()
+_logger = logging.getLogger(__name__)
+
+_COUNTERS = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+    "indexes_added",
+    "constraints_added",
+)
+
+
+def register(listener):
+    _listeners.append(listener)
+    return listener
+
+
+def unregister(listener):
+    _listeners.remove(listener)
+
+
+class Operation:
+    # Measurements of one logical nxneo4j call, such as `add_edges_from`,
+    # `pagerank` or `NodeView.__len__`, summed over all of its queries.
+    # Times are in seconds; `server_time` is what the server reports for
+    # producing and streaming the results. With profiling, `plans` holds the
+    # PROFILE plan of every query and `db_hits` their total.
+    def __init__(self, name, graph, profile):
+        self.name = name
+        self.graph = graph
+        self.profile = profile
+        self.wall_time = 0.0
+        self.server_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.counters = {}
+        self.db_hits = 0
+        self.plans = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, rows, summary):
+        available = getattr(summary, "result_available_after", None) or 0
+        consumed = getattr(summary, "result_consumed_after", None) or 0
+        with self._lock:
+            self.queries += 1
+            self.rows += rows
+            self.server_time += (available + consumed) / 1000.0
+            counters = getattr(summary, "counters", None)
+            for name in _COUNTERS:
+                value = getattr(counters, name, 0)
+                if value:
+                    self.counters[name] = self.counters.get(name, 0) + value
+            profile = getattr(summary, "profile", None)
+            if self.profile and profile is not None:
+                plan = _plan(profile)
+                self.plans.append(plan)
+                self.db_hits += _db_hits(plan)
+
+
+def _plan(profile):
+    # Driver 1.x returns ProfiledPlan objects, later drivers plain dicts.
+    if isinstance(profile, dict):
+        return {
+            "operator": profile.get("operatorType"),
+            "db_hits": profile.get("dbHits", 0),
+            "rows": profile.get("rows", 0),
+            "children": [_plan(c) for c in profile.get("children", [])]
+        }
+    return {
+        "operator": profile.operator_type,
+        "db_hits": profile.db_hits,
+        "rows": profile.rows,
+        "children": [_plan(c) for c in profile.children]
+    }
+
+
+def _db_hits(plan):
+    return plan["db_hits"] + sum(_db_hits(c) for c in plan["children"])
+
+
+def current():
+    return getattr(_local, "operation", None)
+
+
+def _start(graph, name):
+    if not (_listeners or graph._listeners) or current() is not None:
+        return None
+    profile = graph.profile_rate > 0 and random.random() < graph.profile_rate
+    return Operation(name, graph, profile)
+
+
+def _finish(operation):
+    # A failing listener is logged, it doesn't fail the graph call.
+    operation.wall_time = time.perf_counter() - operation._started
+    for listener in _listeners + operation.graph._listeners:
+        try:
+            listener(operation)
+        except Exception:
+            _logger.exception("Instrumentation listener %r failed on %s", listener, operation.name)
+
+
+class TracedGenerator:
+    # Iterates `generator` with `operation` current. The operation is only
+    # current while the generator runs, the caller may do other work between
+    # two items. It finishes when the generator is exhausted, fails or is
+    # closed, or when this object is garbage collected, also if it was never
+    # iterated.
+    def __init__(self, generator, operation):
+        self.generator = generator
+        self.operation = operation
+        self.finished = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.finished:
+            raise StopIteration
+        previous = current()
+        _local.operation = self.operation
+        try:
+            return next(self.generator)
+        except BaseException:
+            _local.operation = previous
+            self.close()
+            raise
+        finally:
+            _local.operation = previous
+
+    def close(self):
+        if not self.finished:
+            self.finished = True
+            try:
+                self.generator.close()
+            finally:
+                _finish(self.operation)
+
+    def __del__(self):
+        self.close()
+
+
+def instrumented(name):
+    # Measures calls of the decorated graph or view method as operation
+    # `name`. Calls nested inside another operation are part of that one.
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            graph = self if hasattr(self, "_listeners") else self.graph
+            operation = _start(graph, name)
+            if operation is None:
+                return fn(self, *args, **kwargs)
+            _local.operation = operation
+            try:
+                result = fn(self, *args, **kwargs)
+            except BaseException:
+                _local.operation = None
+                _finish(operation)
+                raise
+            _local.operation = None
+            if inspect.isgenerator(result):
+                return TracedGenerator(result, operation)
+            _finish(operation)
+            return result
+        return wrapper
+    return decorate
+
+
+class TracedRunner:
+    # Wraps a session or transaction so that the results of its queries are
+    # recorded on `operation`; with profiling the queries run with PROFILE.
+    def __init__(self, runner, operation):
+        self.runner = runner
+        self.operation = operation
+
+    def run(self, query, parameters=None, **kwparameters):
+        if self.operation.profile:
+            query = "PROFILE " + query
+        return TracedResult(self.runner.run(query, parameters, **kwparameters), self.operation)
+
+    def __getattr__(self, name):
+        return getattr(self.runner, name)
+
+
+class TracedResult:
+    def __init__(self, result, operation):
+        self.result = result
+        self.operation = operation
+        self.rows = 0
+        self.recorded = False
+
+    def _record(self):
+        if not self.recorded:
+            self.recorded = True
+            self.operation.record(self.rows, self.result.consume())
+
+    def __iter__(self):
+        for record in self.result:
+            self.rows += 1
+            yield record
+        self._record()
+
+    def records(self):
+        return iter(self)
+
+    def single(self):
+        record = self.result.single()
+        self.rows += record is not None
+        self._record()
+        return record
+
+    def consume(self):
+        summary = self.result.consume()
+        if not self.recorded:
+            self.recorded = True
+            self.operation.record(self.rows, summary)
+        return summary
+
+    def __getattr__(self, name):
+        return getattr(self.result, name)
+
+
+class MetricsCollector:
+    # A listener that aggregates operations by name, for example to export
+    # them periodically to Prometheus or OpenTelemetry:
+    #
+    #     collector = nxneo4j.instrumentation.register(MetricsCollector())
+    #     collector.snapshot()["pagerank"]["wall_time"]
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, operation):
+        with self._lock:
+            stats = self._operations.get(operation.name)
+            if stats is None:
+                stats = self._operations[operation.name] = {
+                    "calls": 0,
+                    "wall_time": 0.0,
+                    "server_time": 0.0,
+                    "queries": 0,
+                    "rows": 0,
+                    "db_hits": 0,
+                    "counters": {}
+                }
+            stats["calls"] += 1
+            stats["wall_time"] += operation.wall_time
+            stats["server_time"] += operation.server_time
+            stats["queries"] += operation.queries
+            stats["rows"] += operation.rows
+            stats["db_hits"] += operation.db_hits
+            for name, value in operation.counters.items():
+                stats["counters"][name] = stats["counters"].get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(stats, counters=dict(stats["counters"]))
+                    for name, stats in self._operations.items()}
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
@@ -0,0 +1,230 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+# Kernels of the "local" backend. They run on the compressed sparse rows of
+# a snapshot.Snapshot (node positions 0..n-1, neighbors of i in
+# indices[indptr[i]:indptr[i+1]]) and return one value per node position.
+# Traversals are level-synchronous: every step expands a whole frontier
+# with array operations instead of visiting one node at a time.
+
+# Below this many sources the process pool costs more than it saves.
+_PARALLEL_SOURCES = 256
+
+# The number of neighbor pairs the triangle count tests at once.
+_WEDGES = 1 << 22
+
+_graph = None
+
+
+def _rows(indptr):
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+
+def _expand(indptr, indices, frontier):
+    # The (node, neighbor) pairs of all relationships of the frontier.
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    offsets = np.arange(counts.sum()) + np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return np.repeat(frontier, counts), indices[offsets].astype(np.int64)
+
+
+def pagerank(indptr, indices, weights, alpha, max_iter, tol=None, start=None, sources=None):
+    # The iteration of algo.pageRank: every node keeps 1 - alpha (only the
+    # `sources` with a personalization) and receives alpha times the score
+    # of its neighbors, split by the relationship weights.
+    n = len(indptr) - 1
+    rows = _rows(indptr)
+    if weights is None:
+        weights = np.ones(len(indices))
+    out = np.bincount(rows, weights, minlength=n)
+    share = np.divide(weights, out[rows], out=np.zeros(len(weights)), where=out[rows] > 0)
+
+    base = np.full(n, 1 - alpha)
+    if sources is not None:
+        base = np.zeros(n)
+        base[sources] = 1 - alpha
+    scores = base.copy() if start is None else np.asarray(start, dtype=np.float64)
+    for _ in range(max_iter):
+        previous = scores
+        scores = base + alpha * np.bincount(indices, previous[rows] * share, minlength=n)
+        if tol is not None and n and np.abs(scores - previous).max() < tol:
+            break
+    return scores
+
+
+def distance_sums(indptr, indices, sources):
+    # For every source, the number of nodes it reaches and the sum of their
+    # distances and of their inverse distances.
+    n = len(indptr) - 1
+    sums = np.zeros((len(sources), 3))
+    for i, source in enumerate(sources):
+        seen = np.zeros(n, dtype=bool)
+        seen[source] = True
+        frontier = np.array([source])
+        distance = 0
+        while len(frontier):
+            distance += 1
+            _, neighbors = _expand(indptr, indices, frontier)
+            frontier = np.unique(neighbors[~seen[neighbors]])
+            seen[frontier] = True
+            sums[i] += (len(frontier), distance * len(frontier), len(frontier) / distance)
+    return sums
+
+
+def _betweenness(indptr, indices, sources):
+    # Brandes' accumulation, summed over `sources`.
+    n = len(indptr) - 1
+    centrality = np.zeros(n)
+    for source in sources:
+        distances = np.full(n, -1)
+        distances[source] = 0
+        sigma = np.zeros(n)
+        sigma[source] = 1
+        frontier = np.array([source])
+        levels = []
+        distance = 0
+        while len(frontier):
+            u, v = _expand(indptr, indices, frontier)
+            frontier = np.unique(v[distances[v] < 0])
+            distances[frontier] = distance + 1
+            on_path = distances[v] == distance + 1
+            u, v = u[on_path], v[on_path]
+            sigma += np.bincount(v, sigma[u], minlength=n)
+            levels.append((u, v))
+            distance += 1
+        delta = np.zeros(n)
+        for u, v in reversed(levels):
+            delta += np.bincount(u, sigma[u] / sigma[v] * (1 + delta[v]), minlength=n)
+        delta[source] = 0
+        centrality += delta
+    return centrality
+
+
+def betweenness(graph, sources, workers=None):
+    # The betweenness from `sources` on the rows of `graph`, with the sources
+    # split across a pool of `workers` processes.
+    return _parallel(_betweenness, graph, sources, workers, sum)
+
+
+def closeness_sums(graph, sources, workers=None):
+    return _parallel(distance_sums, graph, sources, workers, np.concatenate)
+
+
+def _parallel(kernel, graph, sources, workers, combine):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(sources) < _PARALLEL_SOURCES:
+        return kernel(graph.indptr, graph.indices, sources)
+    # The graph is sent to every worker once. A snapshot loaded from a path
+    # is pickled as that path, the workers then map the same file.
+    chunks = np.array_split(sources, workers * 4)
+    with ProcessPoolExecutor(workers, initializer=_initialize, initargs=(graph, )) as pool:
+        return combine(list(pool.map(partial(_run, kernel), chunks)))
+
+
+def _initialize(graph):
+    global _graph
+    _graph = graph
+
+
+def _run(kernel, sources):
+    return kernel(_graph.indptr, _graph.indices, sources)
+
+
+def triangles(indptr, indices):
+    # Triangles through every node of an undirected graph. Relationships
+    # are oriented from the lower to the higher degree node, so each
+    # triangle is found once, from its lowest node, by testing the pairs of
+    # its oriented neighbors. The pairs of all nodes are tested together,
+    # at most _WEDGES at a time.
+    n = len(indptr) - 1
+    degree = np.diff(indptr)
+    rank = np.empty(n, dtype=np.int64)
+    rank[np.lexsort((np.arange(n), degree))] = np.arange(n)
+    rows = _rows(indptr)
+    indices = indices.astype(np.int64)
+    forward = rank[rows] < rank[indices]
+    u, v = rows[forward], indices[forward]
+    order = np.lexsort((v, u))
+    u, v = u[order], v[order]
+    keys = u * n + v
+    starts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(u, minlength=n), out=starts[1:])
+
+    counts = np.zeros(n, dtype=np.int64)
+    # Every oriented relationship is paired with the later ones of its row.
+    later = starts[u + 1] - np.arange(len(u)) - 1
+    total = np.zeros(len(u) + 1, dtype=np.int64)
+    np.cumsum(later, out=total[1:])
+    begin = 0
+    while begin < len(u):
+        end = max(np.searchsorted(total, total[begin] + _WEDGES, side="right") - 1, begin + 1)
+        k = later[begin:end]
+        first = np.repeat(np.arange(begin, end), k)
+        second = first + 1 + np.arange(len(first)) - np.repeat(total[begin:end] - total[begin], k)
+        a, b = v[first], v[second]
+        low = np.where(rank[a] < rank[b], a, b)
+        pairs = low * n + (a + b - low)
+        found = keys[np.minimum(np.searchsorted(keys, pairs), len(keys) - 1)] == pairs
+        counts += np.bincount(np.concatenate([u[first[found]], a[found], b[found]]), minlength=n)
+        begin = end
+    return counts
+
+
+def clustering(indptr, indices, counts):
+    # Self-loops don't close triangles, so they don't count as neighbors.
+    rows = _rows(indptr)
+    degree = np.diff(indptr) - np.bincount(rows[rows == indices], minlength=len(indptr) - 1)
+    pairs = degree * (degree - 1)
+    return np.divide(2.0 * counts, pairs, out=np.zeros(len(counts)), where=pairs > 0)
+
+
+def connected_components(indptr, indices):
+    # Every node takes the smallest position in its neighborhood and then
+    # the label of that node, until nothing changes; the component of a
+    # node is identified by its smallest position.
+    n = len(indptr) - 1
+    labels = np.arange(n)
+    nonempty = np.diff(indptr) > 0
+    while True:
+        smallest = labels.copy()
+        if len(indices):
+            neighbors = np.minimum.reduceat(labels[indices], indptr[:-1][nonempty])
+            smallest[nonempty] = np.minimum(smallest[nonempty], neighbors)
+        smallest = smallest[smallest]
+        if np.array_equal(smallest, labels):
+            return labels
+        labels = smallest
+
+
+def label_propagation(indptr, indices, max_iter=100, seed=0):
+    # Every node adopts the most frequent label among itself and its
+    # neighbors, the smallest one on ties. A random half of the nodes is
+    # updated per round, which keeps synchronous updates from oscillating;
+    # it stops when every node already has its most frequent label.
+    n = len(indptr) - 1
+    random = np.random.RandomState(seed)
+    nodes = np.concatenate([_rows(indptr), np.arange(n)])
+    neighbors = np.concatenate([indices, np.arange(n)])
+    labels = np.arange(n)
+    for _ in range(max_iter):
+        node, label = nodes, labels[neighbors]
+        order = np.lexsort((label, node))
+        node, label = node[order], label[order]
+        first = np.ones(len(node), dtype=bool)
+        first[1:] = (node[1:] != node[:-1]) | (label[1:] != label[:-1])
+        starts = np.flatnonzero(first)
+        counts = np.diff(np.append(starts, len(node)))
+        node, label = node[starts], label[starts]
+        order = np.lexsort((label, -counts, node))
+        node, label = node[order], label[order]
+        first = np.ones(len(node), dtype=bool)
+        first[1:] = node[1:] != node[:-1]
+        best = label[first]
+        if np.array_equal(best, labels):
+            break
+        labels = np.where(random.rand(n) < 0.5, best, labels)
+    return labels
@@ -1,34 +1,25 @@
-def shortest_path(G, source=None, target=None, weight=None):
+def shortest_path(G, source=None, target=None, weight=None, cutoff=None):
+    # Paths from or to one node, and between all pairs, are generators of
+    # (node, path) and (source, {target: path}) pairs; `dict()` turns them
+    # into the dicts networkx returns. `cutoff` limits the depth, or the
+    # distance with a `weight`.
     if source is None:
         if target is None:
             # Find paths between all pairs.
-            if weight is None:
-                # paths = dict(nx.all_pairs_shortest_path(G))
-                paths = {}
-            else:
-                # paths = dict(nx.all_pairs_dijkstra_path(G, weight=weight))
-                paths = {}
+            paths = G.all_pairs_shortest_path(weight, cutoff)
         else:
             # Find paths from all nodes co-accessible to the target.
             if weight is None:
-                # paths = nx.single_source_shortest_path(G, target)
-                # paths = G.single_source_shortest_path(target)
-                paths = []
+                paths = G.single_source_shortest_path(target, cutoff, reverse=True)
             else:
-                # paths = nx.single_source_dijkstra_path(G, target,
-                #                                        weight=weight)
-                paths = []
+                paths = G.single_source_dijkstra_path(target, weight, cutoff, reverse=True)
     else:
         if target is None:
             # Find paths to all nodes accessible from the source.
             if weight is None:
-                # paths = nx.single_source_shortest_path(G, source)
-                paths = []
-                # paths = G.single_source_shortest_path(source)
+                paths = G.single_source_shortest_path(source, cutoff)
             else:
-                # paths = nx.single_source_dijkstra_path(G, source,
-                #                                        weight=weight)
-                paths = []
+                paths = G.single_source_dijkstra_path(source, weight, cutoff)
         else:
             # Find shortest source-target path.
             if weight is None:
@@ -37,3 +28,19 @@ def shortest_path(G, source=None, target=None, weight=None):
                 paths = G.shortest_weighted_path(source, target, weight)
 
     return paths
+
+
+def single_source_shortest_path(G, source, cutoff=None):
+    return G.single_source_shortest_path(source, cutoff)
+
+
+def single_source_dijkstra_path(G, source, cutoff=None, weight="weight"):
+    return G.single_source_dijkstra_path(source, weight, cutoff)
+
+
+def all_pairs_shortest_path(G, cutoff=None):
+    return G.all_pairs_shortest_path(None, cutoff)
+
+
+def all_pairs_dijkstra_path(G, cutoff=None, weight="weight"):
+    return G.all_pairs_shortest_path(weight, cutoff)
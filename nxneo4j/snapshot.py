@@ -0,0 +1,611 @@
+import json
+import os
+import time
+
+import numpy as np
+from networkx.exception import NetworkXError
+
+from nxneo4j import local
+from nxneo4j.base_graph import _is_bunch, _check_output, _sample_size, _personalization_sources
+
+_CHUNK = 65536
+
+
+def _tolist(array):
+    # Converts a possibly memory-mapped array to Python values chunk by chunk,
+    # so iterating never copies the whole array.
+    for start in range(0, len(array), _CHUNK):
+        for value in array[start:start + _CHUNK].tolist():
+            yield value
+
+
+def _keys(keys):
+    types = set(map(type, keys))
+    if len(types) > 1:
+        raise ValueError("A snapshot needs identifiers of one type, not %s" % (
+            ", ".join(sorted(t.__name__ for t in types)), ))
+    return np.array(keys)
+
+
+def _csr(sources, targets, weights, node_count):
+    # Sorts the (source, target) positions into compressed sparse rows,
+    # dropping parallel relationships like a networkx (Di)Graph does.
+    order = np.lexsort((targets, sources))
+    sources = sources[order]
+    targets = targets[order]
+    keep = np.ones(len(sources), dtype=bool)
+    keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    sources = sources[keep]
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    dtype = np.int32 if node_count < 2 ** 31 else np.int64
+    indices = targets[keep].astype(dtype)
+    if weights is not None:
+        weights = weights[order][keep]
+    return indptr, indices, weights
+
+
+class Snapshot:
+    # A read-only local copy of a Graph in compressed sparse rows: node i is
+    # keys[i], its neighbors are the positions indices[indptr[i]:indptr[i+1]]
+    # and, if the snapshot was taken with a `weight`, weights holds the
+    # weight of the relationship to each of them. Nodes are sorted by their
+    # identifier, so looking one up is a binary search in `keys`.
+    #
+    # It offers the read API of the graph it was taken from (nodes, edges,
+    # adj, neighbors, degree), answered from the arrays without any round
+    # trip. Node properties are not part of the snapshot, relationships only
+    # carry the weight and parallel relationships are merged.
+    #
+    # save(path) writes the arrays as .npy files; Snapshot.load(path) maps
+    # them read-only, so worker processes that load the same path share its
+    # pages. A loaded snapshot is pickled as its path for the same reason.
+    #
+    # It is also the "local" backend of the algorithms: its methods take the
+    # arguments of the BaseGraph methods of the same name and run the
+    # kernels of nxneo4j.local on the arrays.
+    directed = False
+    backend = "local"
+
+    def __init__(self, arrays, weight=None, path=None):
+        self._arrays = arrays
+        self.weight = weight
+        self.path = path
+        self.keys = arrays["keys"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.weights = arrays.get("weights")
+        self._degree_arrays = {}
+
+    @classmethod
+    def build(cls, node_ids, keys, sources, targets, weights=None, weight=None):
+        # Builds a snapshot from the internal ids and identifiers of the
+        # nodes and the internal ids of the relationship endpoints.
+        keys = _keys(keys)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        node_ids = np.asarray(node_ids, dtype=np.int64)[order]
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+
+        # Relationships to nodes created after the nodes were read are
+        # dropped.
+        by_id = np.argsort(node_ids)
+        sorted_ids = node_ids[by_id]
+        if len(sorted_ids) == 0:
+            sources = targets = np.zeros(0, dtype=np.int64)
+            weights = None if weights is None else np.zeros(0)
+        else:
+            u = np.minimum(np.searchsorted(sorted_ids, sources), len(sorted_ids) - 1)
+            v = np.minimum(np.searchsorted(sorted_ids, targets), len(sorted_ids) - 1)
+            found = (sorted_ids[u] == sources) & (sorted_ids[v] == targets)
+            sources = by_id[u[found]]
+            targets = by_id[v[found]]
+            if weights is not None:
+                weights = weights[found]
+
+        arrays = {"keys": keys}
+        arrays.update(cls._rows(sources, targets, weights, len(keys)))
+        return cls({k: v for k, v in arrays.items() if v is not None}, weight)
+
+    @staticmethod
+    def _rows(sources, targets, weights, node_count):
+        # Both directions of every relationship.
+        indptr, indices, weights = _csr(
+            np.concatenate([sources, targets]),
+            np.concatenate([targets, sources]),
+            None if weights is None else np.concatenate([weights, weights]),
+            node_count
+        )
+        return {"indptr": indptr, "indices": indices, "weights": weights}
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, array in self._arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array, allow_pickle=False)
+        with open(os.path.join(path, "snapshot.json"), "w") as f:
+            json.dump({
+                "directed": self.directed,
+                "weight": self.weight,
+                "arrays": sorted(self._arrays)
+            }, f)
+
+    @staticmethod
+    def load(path, mmap_mode="r"):
+        with open(os.path.join(path, "snapshot.json")) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in meta["arrays"]
+        }
+        cls = DiSnapshot if meta["directed"] else Snapshot
+        return cls(arrays, meta["weight"], path)
+
+    def __reduce__(self):
+        if self.path is not None:
+            return Snapshot.load, (self.path, )
+        return self.__class__, (self._arrays, self.weight)
+
+    def index(self, n):
+        # The position of node `n` in the arrays.
+        keys = self.keys
+        try:
+            i = int(np.searchsorted(keys, n))
+        except TypeError:
+            raise KeyError(n)
+        if i == len(keys) or keys[i] != n:
+            raise KeyError(n)
+        return i
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __contains__(self, n):
+        return n in self.nodes
+
+    def has_node(self, n):
+        return n in self.nodes
+
+    def __len__(self):
+        return len(self.keys)
+
+    def number_of_nodes(self):
+        return len(self.keys)
+
+    @property
+    def nodes(self):
+        nodes = SnapshotNodeView(self)
+        self.__dict__["nodes"] = nodes
+        return nodes
+
+    @property
+    def edges(self):
+        edges = SnapshotEdgeView(self)
+        self.__dict__["edges"] = edges
+        return edges
+
+    @property
+    def adj(self):
+        adj = SnapshotAdjacencyView(self, self.indptr, self.indices, self.weights)
+        self.__dict__["adj"] = adj
+        return adj
+
+    @property
+    def degree(self):
+        degree = SnapshotDegreeView(self, "BOTH")
+        self.__dict__["degree"] = degree
+        return degree
+
+    def __getitem__(self, n):
+        return self.adj[n]
+
+    def neighbors(self, n):
+        return iter(self.adj.neighbors([n])[n])
+
+    def neighbors_of(self, nbunch):
+        return self.adj.neighbors(nbunch)
+
+    def local_snapshot(self, weight=None):
+        return self
+
+    def _undirected(self):
+        # The rows of the undirected graph, for the algorithms that ignore
+        # the direction of relationships.
+        return self.indptr, self.indices
+
+    def _weights(self, weight):
+        # In a snapshot taken without a weight every relationship weighs 1,
+        # like relationships without the property do on the server.
+        if weight is None or self.weight is None:
+            return None
+        if weight != self.weight:
+            raise ValueError("The snapshot only holds the %r weight, not %r" % (self.weight, weight))
+        return self.weights
+
+    def _positions(self, nodes):
+        # The positions of the `nodes` that are in the snapshot.
+        if nodes is None:
+            return None
+        return np.array([self.index(n) for n in dict.fromkeys(nodes) if n in self.nodes], dtype=np.int64)
+
+    def _scores(self, values, value, output, positions=None):
+        keys = self.keys if positions is None else self.keys[positions]
+        if output is None:
+            return dict(zip(_tolist(keys), _tolist(values)))
+        _check_output(output)
+        if output == "numpy":
+            return np.array(keys), values
+        import pandas as pd
+        return pd.DataFrame({"node": np.array(keys), value: values})
+
+    def pagerank(self, alpha, max_iter, output=None, tol=None, weight=None, nstart=None, personalization=None,
+                 write_property=None):
+        _read_only(write_property)
+        sources = self._positions(_personalization_sources(personalization))
+        start = None
+        if nstart is not None:
+            if not isinstance(nstart, dict):
+                raise ValueError("A snapshot holds no node properties, nstart must be a dict")
+            start = np.full(len(self), 1 - alpha)
+            positions = self._positions(nstart)
+            start[positions] = [nstart[n] for n in self.keys[positions].tolist()]
+        scores = local.pagerank(self.indptr, self.indices, self._weights(weight), alpha, max_iter, tol, start,
+                                sources if len(sources) else None)
+        return self._scores(scores, "score", output)
+
+    def personalized_pagerank(self, personalizations, alpha=0.85, max_iter=100, tol=None, weight=None, output=None):
+        return [
+            self.pagerank(alpha, max_iter, output, tol, weight, personalization=personalization)
+            for personalization in personalizations
+        ]
+
+    def betweenness_centrality(self, output=None, k=None, epsilon=None, delta=0.1, time_budget=None,
+                               write_property=None, workers=None, seed=None):
+        # The sources are split across `workers` processes, all CPUs by
+        # default. A sample of `k` sources is drawn with `seed`, an int or a
+        # RandomState, and the sums are scaled by n/k. With `time_budget`
+        # a pilot run on the first sources measures the time per source, as
+        # on the server, and is part of the sample.
+        _read_only(write_property)
+        node_count = len(self)
+        k = _sample_size(node_count, k, epsilon, delta)
+        if time_budget is None and (k is None or k >= node_count):
+            return self._scores(local.betweenness(self, np.arange(node_count), workers), "centrality", output)
+
+        random = seed if isinstance(seed, np.random.RandomState) else np.random.RandomState(seed)
+        sources = random.permutation(node_count)
+        k = node_count if k is None else min(k, node_count)
+        pilot = 0
+        centrality = np.zeros(node_count)
+        if time_budget is not None:
+            pilot = min(32, k)
+            started = time.monotonic()
+            centrality += local.betweenness(self, sources[:pilot], 1)
+            elapsed = time.monotonic() - started
+            k = min(k, max(pilot, int(pilot * time_budget / max(elapsed, 1e-6))))
+        if k > pilot:
+            centrality += local.betweenness(self, sources[pilot:k], workers)
+        if k:
+            centrality *= node_count / k
+        return self._scores(centrality, "centrality", output)
+
+    def _distance_sums(self, nodes):
+        positions = self._positions(nodes)
+        sources = np.arange(len(self)) if positions is None else positions
+        return positions, local.closeness_sums(self, sources).T
+
+    def closeness_centrality(self, wf_improved=True, output=None, nodes=None, write_property=None):
+        # The formulas of algo.closeness.stream, see base_graph._closeness.
+        _read_only(write_property)
+        positions, (reachable, farness, _) = self._distance_sums(nodes)
+        centrality = np.divide(reachable, farness, out=np.zeros(len(farness)), where=farness > 0)
+        if wf_improved and len(self) > 1:
+            centrality *= reachable / (len(self) - 1)
+        return self._scores(centrality, "centrality", output, positions)
+
+    def harmonic_centrality(self, output=None, nodes=None):
+        positions, (_, _, harmonic) = self._distance_sums(nodes)
+        if len(self) > 1:
+            harmonic = harmonic / (len(self) - 1)
+        return self._scores(harmonic, "centrality", output, positions)
+
+    def triangles(self, output=None, nodes=None, write_property=None, coefficient_property=None):
+        _read_only(write_property)
+        counts = local.triangles(*self._undirected())
+        positions = self._positions(nodes)
+        return self._scores(counts if positions is None else counts[positions], "triangles", output, positions)
+
+    def clustering(self, output=None, nodes=None, write_property=None, triangles_property=None):
+        _read_only(write_property)
+        indptr, indices = self._undirected()
+        coefficients = local.clustering(indptr, indices, local.triangles(indptr, indices))
+        positions = self._positions(nodes)
+        if positions is not None:
+            coefficients = coefficients[positions]
+        return self._scores(coefficients, "coefficient", output, positions)
+
+    def average_clustering(self):
+        indptr, indices = self._undirected()
+        coefficients = local.clustering(indptr, indices, local.triangles(indptr, indices))
+        return float(coefficients.mean()) if len(coefficients) else 0.0
+
+    def label_propagation(self, output=None, write_property=None):
+        _read_only(write_property)
+        return self._partition(local.label_propagation(*self._undirected()), output)
+
+    def connected_components(self, output=None, write_property=None):
+        _read_only(write_property)
+        return self._partition(local.connected_components(*self._undirected()), output)
+
+    def connected_component_sizes(self, output=None):
+        communities, sizes = np.unique(local.connected_components(*self._undirected()), return_counts=True)
+        if output is None:
+            return dict(zip(communities.tolist(), sizes.tolist()))
+        _check_output(output)
+        if output == "numpy":
+            return communities, sizes
+        import pandas as pd
+        return pd.DataFrame({"community": communities, "size": sizes})
+
+    def number_connected_components(self):
+        return len(np.unique(local.connected_components(*self._undirected())))
+
+    def _partition(self, labels, output):
+        if output is None:
+            return self._communities(labels)
+        if output == "pairs":
+            return zip(_tolist(self.keys), _tolist(labels))
+        return self._scores(labels, "community", output)
+
+    def _communities(self, labels):
+        order = np.argsort(labels, kind="stable")
+        labels = labels[order]
+        bounds = np.flatnonzero(np.diff(labels)) + 1
+        for community in np.split(order, bounds) if len(order) else []:
+            yield set(self.keys[community].tolist())
+
+    def _edge_rows(self):
+        # Every relationship once, as (source, target) positions and weights.
+        rows = np.repeat(np.arange(len(self.keys)), np.diff(self.indptr))
+        once = rows <= self.indices
+        weights = None if self.weights is None else self.weights[once]
+        return rows[once], self.indices[once], weights
+
+    def _degrees(self, direction, weight):
+        degrees = self._degree_arrays.get((direction, weight))
+        if degrees is None:
+            degrees = self._degree_arrays[(direction, weight)] = self._count_degrees(direction, weight)
+        return degrees
+
+    def _count_degrees(self, direction, weight):
+        if weight is not None and weight != self.weight:
+            raise ValueError("The snapshot only holds the %r weight, not %r" % (self.weight, weight))
+        # Self-loops count twice, like in networkx.
+        rows = np.repeat(np.arange(len(self.keys)), np.diff(self.indptr))
+        loops = rows == self.indices
+        if weight is None:
+            return np.diff(self.indptr) + np.bincount(rows[loops], minlength=len(self.keys))
+        return (np.bincount(rows, self.weights, minlength=len(self.keys)) +
+                np.bincount(rows[loops], self.weights[loops], minlength=len(self.keys)))
+
+
+class DiSnapshot(Snapshot):
+    # The snapshot of a DiGraph keeps the outgoing and, in pred_indptr and
+    # pred_indices, the incoming relationships of every node.
+    directed = True
+
+    def __init__(self, arrays, weight=None, path=None):
+        Snapshot.__init__(self, arrays, weight, path)
+        self.pred_indptr = arrays["pred_indptr"]
+        self.pred_indices = arrays["pred_indices"]
+        self.pred_weights = arrays.get("pred_weights")
+        self._undirected_rows = None
+
+    @staticmethod
+    def _rows(sources, targets, weights, node_count):
+        indptr, indices, out_weights = _csr(sources, targets, weights, node_count)
+        pred_indptr, pred_indices, pred_weights = _csr(targets, sources, weights, node_count)
+        return {
+            "indptr": indptr,
+            "indices": indices,
+            "weights": out_weights,
+            "pred_indptr": pred_indptr,
+            "pred_indices": pred_indices,
+            "pred_weights": pred_weights
+        }
+
+    @property
+    def succ(self):
+        return self.adj
+
+    @property
+    def pred(self):
+        pred = SnapshotAdjacencyView(self, self.pred_indptr, self.pred_indices, self.pred_weights)
+        self.__dict__["pred"] = pred
+        return pred
+
+    @property
+    def in_degree(self):
+        in_degree = SnapshotDegreeView(self, "INCOMING")
+        self.__dict__["in_degree"] = in_degree
+        return in_degree
+
+    @property
+    def out_degree(self):
+        out_degree = SnapshotDegreeView(self, "OUTGOING")
+        self.__dict__["out_degree"] = out_degree
+        return out_degree
+
+    def successors(self, n):
+        return self.neighbors(n)
+
+    def _undirected(self):
+        if self._undirected_rows is None:
+            rows = np.repeat(np.arange(len(self.keys)), np.diff(self.indptr))
+            indptr, indices, _ = _csr(
+                np.concatenate([rows, self.indices]),
+                np.concatenate([self.indices, rows]),
+                None,
+                len(self.keys)
+            )
+            self._undirected_rows = (indptr, indices)
+        return self._undirected_rows
+
+    def predecessors(self, n):
+        return iter(self.pred.neighbors([n])[n])
+
+    def _edge_rows(self):
+        rows = np.repeat(np.arange(len(self.keys)), np.diff(self.indptr))
+        return rows, self.indices, self.weights
+
+    def _count_degrees(self, direction, weight):
+        # Like G.degree, the degree of a DiGraph counts both directions.
+        if direction == "BOTH":
+            return self._degrees("OUTGOING", weight) + self._degrees("INCOMING", weight)
+        if weight is not None and weight != self.weight:
+            raise ValueError("The snapshot only holds the %r weight, not %r" % (self.weight, weight))
+        indptr = self.indptr if direction == "OUTGOING" else self.pred_indptr
+        if weight is None:
+            return np.diff(indptr)
+        weights = self.weights if direction == "OUTGOING" else self.pred_weights
+        rows = np.repeat(np.arange(len(self.keys)), np.diff(indptr))
+        return np.bincount(rows, weights, minlength=len(self.keys))
+
+
+def _read_only(write_property):
+    if write_property is not None:
+        raise ValueError("write_property is only supported by the server backend")
+
+
+class SnapshotNodeView:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __iter__(self):
+        return _tolist(self.snapshot.keys)
+
+    def __len__(self):
+        return len(self.snapshot.keys)
+
+    def __contains__(self, n):
+        try:
+            self.snapshot.index(n)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, n):
+        self.snapshot.index(n)
+        return {}
+
+    def __call__(self, data=False, default=None):
+        if not data:
+            return iter(self)
+        if isinstance(data, bool):
+            return ((n, {}) for n in self)
+        return ((n, default) for n in self)
+
+
+class SnapshotEdgeView:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __iter__(self):
+        return self.__call__()
+
+    def __len__(self):
+        return len(self.snapshot._edge_rows()[0])
+
+    def __call__(self, data=False, default=None):
+        keys = self.snapshot.keys
+        sources, targets, weights = self.snapshot._edge_rows()
+        weight = self.snapshot.weight
+        for start in range(0, len(sources), _CHUNK):
+            us = keys[sources[start:start + _CHUNK]].tolist()
+            vs = keys[targets[start:start + _CHUNK]].tolist()
+            if not data:
+                for edge in zip(us, vs):
+                    yield edge
+                continue
+            if weights is None:
+                ws = [None] * len(us)
+            else:
+                ws = weights[start:start + _CHUNK].tolist()
+            if isinstance(data, bool):
+                for u, v, w in zip(us, vs, ws):
+                    yield u, v, {} if w is None else {weight: w}
+            else:
+                for u, v, w in zip(us, vs, ws):
+                    yield u, v, w if data == weight and w is not None else default
+
+
+class SnapshotAdjacencyView:
+    def __init__(self, snapshot, indptr, indices, weights):
+        self.snapshot = snapshot
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    def __iter__(self):
+        return iter(self.snapshot.nodes)
+
+    def __len__(self):
+        return len(self.snapshot.nodes)
+
+    def __contains__(self, n):
+        return n in self.snapshot.nodes
+
+    def _row(self, i):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        neighbors = self.snapshot.keys[self.indices[start:end]].tolist()
+        if self.weights is None:
+            return {v: {} for v in neighbors}
+        weight = self.snapshot.weight
+        return {v: {weight: w} for v, w in zip(neighbors, self.weights[start:end].tolist())}
+
+    def __getitem__(self, n):
+        return self._row(self.snapshot.index(n))
+
+    def items(self):
+        for i, n in enumerate(self.snapshot.nodes):
+            yield n, self._row(i)
+
+    def neighbors(self, nbunch):
+        keys = self.snapshot.keys
+        neighbors = {}
+        for n in nbunch:
+            try:
+                i = self.snapshot.index(n)
+            except KeyError:
+                raise NetworkXError("The node %s is not in the graph." % (n, ))
+            neighbors[n] = keys[self.indices[self.indptr[i]:self.indptr[i + 1]]].tolist()
+        return neighbors
+
+
+class SnapshotDegreeView:
+    def __init__(self, snapshot, direction, weight=None):
+        self.snapshot = snapshot
+        self.direction = direction
+        self.weight = weight
+
+    def _values(self):
+        return self.snapshot._degrees(self.direction, self.weight)
+
+    def __iter__(self):
+        return zip(self.snapshot.nodes, _tolist(self._values()))
+
+    def __len__(self):
+        return len(self.snapshot.nodes)
+
+    def __getitem__(self, n):
+        return self._values()[self.snapshot.index(n)].item()
+
+    def __call__(self, nbunch=None, weight=None):
+        view = self if weight == self.weight else SnapshotDegreeView(self.snapshot, self.direction, weight)
+        if nbunch is None:
+            return view
+        if not _is_bunch(nbunch):
+            return view[nbunch]
+        return [(n, view[n]) for n in nbunch if n in self.snapshot]
@@ -0,0 +1,12 @@
+def backend(G, name=None, weight=None):
+    # The graph to run an algorithm on: G itself for the "server" backend,
+    # its local snapshot for the "local" one. `name` defaults to the backend
+    # of G, "backend" in the graph config.
+    name = name or getattr(G, "backend", "server")
+    if name == "server":
+        return G
+    if name != "local":
+        raise ValueError("backend must be 'server' or 'local', not %r" % (name, ))
+    if not hasattr(G, "local_snapshot"):
+        raise ValueError("%s doesn't support the local backend" % (type(G).__name__, ))
+    return G.local_snapshot(weight)
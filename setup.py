@@ -41,8 +41,14 @@ if __name__ == "__main__":
         platforms="All",
         url="http://markhneedham.com",
         install_requires=[
-            'neo4j-driver',
+            # The queries use the {param} syntax and the algo.* procedures
+            # of Neo4j 3.5, which driver 5 and later can't connect to.
+            'neo4j>=1.7,<5',
         ],
+        extras_require={
+            'numpy': ['numpy'],
+            'pandas': ['numpy', 'pandas'],
+        },
         packages=packages,
         zip_safe=False
     )
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from neo4j import GraphDatabase
+import nxneo4j
+from networkx.exception import NetworkXError
+
+driver = GraphDatabase.driver("bolt://localhost:7687")
+
+config = {
+    "node_label": "Food",
+    "relationship_type": "CONTAINS",
+    "identifier_property": "name"
+}
+
+def run(coroutine_function):
+    asyncio.run(coroutine_function(nxneo4j.AsyncGraph(driver, config, chunk_size=2)))
+
+def test_add_node():
+    async def check(G):
+        await G.clear()
+        await G.add_node("Strawberry", color="red")
+        await G.add_node("Blackberry", color="black")
+        assert await G.number_of_nodes() == 2
+        assert (await G.nodes["Strawberry"])["color"] == "red"
+        assert sorted([n async for n in G.nodes]) == ["Blackberry", "Strawberry"]
+    run(check)
+
+def test_remove_node():
+    async def check(G):
+        await G.clear()
+        await G.add_node("Strawberry")
+        await G.remove_node("Strawberry")
+        assert await G.number_of_nodes() == 0
+        with pytest.raises(NetworkXError):
+            await G.remove_node("Strawberry")
+    run(check)
+
+def test_concurrent_calls():
+    async def check(G):
+        await G.clear()
+        await asyncio.gather(*(G.add_edge("Smoothie", fruit) for fruit in ["Banana", "Kiwi", "Mango"]))
+        assert await G.edges.count() == 3
+        assert sorted([(u, v) async for u, v in G.edges]) == [
+            ("Smoothie", "Banana"), ("Smoothie", "Kiwi"), ("Smoothie", "Mango")
+        ]
+    run(check)
+
+def test_algorithms():
+    async def check(G):
+        await G.clear()
+        await G.add_edges_from([("Smoothie", "Banana"), ("Smoothie", "Kiwi"), ("Cake", "Flour")])
+        scores = await G.pagerank(0.85, 20)
+        assert set(scores) == {"Smoothie", "Banana", "Kiwi", "Cake", "Flour"}
+        communities = [c async for c in G.label_propagation()]
+        assert sorted(map(sorted, communities)) == sorted(map(sorted, await G.label_propagation()))
+        assert await G.call(nxneo4j.number_connected_components) == 2
+        paths = dict([p async for p in G.single_source_shortest_path("Banana")])
+        assert paths["Kiwi"] == ["Banana", "Smoothie", "Kiwi"]
+    run(check)
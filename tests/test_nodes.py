@@ -1,7 +1,10 @@
+import threading
 import pytest
 from neo4j import GraphDatabase, basic_auth
+from neo4j.exceptions import CypherTypeError
 import nxneo4j
 import networkx as nx
+import numpy as np
 from networkx.exception import NetworkXError
 
 driver = GraphDatabase.driver("bolt://localhost:7687")
@@ -19,6 +22,21 @@ def test_clear():
     assert len(G) == 0
     assert len(G.edges) == 0
 
+def test_clear_batches():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    progress = []
+    G.clear(batch_size=2, progress=lambda deleted, stats: progress.append(deleted))
+    assert len(G) == 0
+    assert progress[-1] == 7
+
+def test_remove_nodes_from():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water")])
+    stats = G.remove_nodes_from(["Strawberry", "Water", "Blackberry"], batch_size=2)
+    assert [batch["nodes_deleted"] for batch in stats] == [2, 0]
+    assert list(G.nodes) == ["Sugar"]
+
 def test_add_node():
     G.clear()
     G.add_node("Strawberry", color="red")
@@ -54,6 +72,323 @@ def test_nodeview():
     node = list(G.nodes())[0]
     assert node == "Apple"
 
+def test_nodeview_pagination():
+    G.clear()
+    for name in ["Apple", "Banana", "Cherry", "Date", "Elderberry"]:
+        G.add_node(name)
+    assert list(G.nodes(page_size=2)) == ["Apple", "Banana", "Cherry", "Date", "Elderberry"]
+    assert list(G.nodes(page_size=2, after="Banana")) == ["Cherry", "Date", "Elderberry"]
+    assert sorted(G.nodes) == ["Apple", "Banana", "Cherry", "Date", "Elderberry"]
+
+def test_add_nodes_from_batches():
+    G.clear()
+    stats = G.add_nodes_from(("Fruit %d" % i for i in range(5)), batch_size=2, tropic=True)
+    assert [batch["nodes_created"] for batch in stats] == [2, 2, 1]
+    assert len(G) == 5
+    assert G.nodes["Fruit 3"]["tropic"] is True
+
+def test_ensure_schema():
+    G.ensure_schema()
+    assert G.has_identifier_index()
+    assert not G.ensure_schema()
+
+def test_batch():
+    G.clear()
+    with G.batch():
+        G.add_node("Strawberry", color="red")
+        G.add_edge("Strawberry", "Cream")
+        G.remove_node("Strawberry")
+        G.add_node("Strawberry", color="green")
+        assert len(G) == 0
+    assert len(G) == 2
+    assert len(G.edges) == 0
+    assert G.nodes["Strawberry"]["color"] == "green"
+    with pytest.raises(NetworkXError):
+        with G.batch():
+            G.add_node("Blueberry")
+            G.remove_node("Raspberry")
+    assert "Blueberry" not in G
+    # Other threads don't write into the batch.
+    with G.batch():
+        G.add_node("Blueberry")
+        thread = threading.Thread(target=G.add_node, args=("Raspberry", ))
+        thread.start()
+        thread.join()
+        assert "Raspberry" in G
+        assert "Blueberry" not in G
+    assert "Blueberry" in G
+
+def test_transaction():
+    G.clear()
+    with G.transaction():
+        G.add_node("Strawberry")
+        G.add_node("Blackberry")
+        assert len(G) == 2
+    assert len(G) == 2
+    with pytest.raises(KeyError):
+        with G.transaction():
+            G.add_node("Raspberry")
+            raise KeyError("Raspberry")
+    assert len(G) == 2
+
+def test_cache():
+    C = nxneo4j.Graph(driver, dict(config, cache_size=100))
+    C.clear()
+    C.add_node("Strawberry", color="red")
+    assert "Strawberry" in C
+    assert "Blackberry" not in C
+    assert len(C) == 1
+    C.add_node("Blackberry")
+    assert "Blackberry" in C
+    assert len(C) == 2
+    G.add_node("Raspberry")
+    assert len(C) == 2
+    C.refresh_cache()
+    assert len(C) == 3
+
+def test_adjacency():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Blackberry", "Sugar"), ("Sugar", "Water")])
+    assert set(G["Sugar"]) == {"Strawberry", "Blackberry", "Water"}
+    assert set(G.neighbors("Water")) == {"Sugar"}
+    assert dict(G.degree) == {"Strawberry": 1, "Blackberry": 1, "Sugar": 3, "Water": 1}
+    assert G.degree["Sugar"] == 3
+    assert {n: set(vs) for n, vs in G.neighbors_of(["Sugar", "Water"]).items()} == {
+        "Sugar": {"Strawberry", "Blackberry", "Water"},
+        "Water": {"Sugar"}
+    }
+    with pytest.raises(NetworkXError):
+        G.neighbors_of(["Raspberry"])
+
+def test_single_source_shortest_path():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    paths = dict(nxneo4j.shortest_path(G, "Strawberry"))
+    assert paths["Ice"] == ["Strawberry", "Sugar", "Water", "Ice"]
+    assert set(dict(nxneo4j.shortest_path(G, "Strawberry", cutoff=1))) == {"Strawberry", "Sugar"}
+    paths = dict(nxneo4j.shortest_path(G, target="Ice"))
+    assert paths["Strawberry"] == ["Strawberry", "Sugar", "Water", "Ice"]
+    with pytest.raises(nx.NodeNotFound):
+        list(nxneo4j.shortest_path(G, "Raspberry"))
+
+def test_weighted_shortest_path():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water")], weight=1)
+    G.add_edge("Strawberry", "Water", weight=5)
+    G.add_edge("Water", "Ice", weight=2)
+    paths = dict(nxneo4j.shortest_path(G, "Strawberry", weight="weight"))
+    assert paths["Water"] == ["Strawberry", "Sugar", "Water"]
+    assert paths["Ice"] == ["Strawberry", "Sugar", "Water", "Ice"]
+    assert dict(nxneo4j.shortest_path(G, "Strawberry"))["Water"] == ["Strawberry", "Water"]
+    assert set(dict(nxneo4j.shortest_path(G, "Strawberry", weight="weight", cutoff=2))) == {
+        "Strawberry", "Sugar", "Water"
+    }
+    paths = dict(nxneo4j.shortest_path(G, weight="weight"))
+    assert paths["Ice"]["Strawberry"] == ["Ice", "Water", "Sugar", "Strawberry"]
+    assert G._projection is None
+
+def test_node_filters():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Strawberry"), ("Water", "Ice")])
+    assert nxneo4j.triangles(G, nodes=["Sugar", "Ice"]) == {"Sugar": 1, "Ice": 0}
+    assert nxneo4j.clustering(G, nodes=["Sugar", "Water"]) == pytest.approx({"Sugar": 1.0, "Water": 1 / 3})
+    assert set(nxneo4j.harmonic_centrality(G, nbunch=["Ice"])) == {"Ice"}
+    assert nxneo4j.closeness_centrality(G, "Water") > nxneo4j.closeness_centrality(G, "Ice")
+
+def test_sampled_betweenness():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    exact = nxneo4j.betweenness_centrality(G)
+    assert nxneo4j.betweenness_centrality(G, k=len(G)) == exact
+    assert set(nxneo4j.betweenness_centrality(G, k=2)) <= set(exact)
+
+def test_pagerank_options():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    scores = nxneo4j.pagerank(G)
+    warm = nxneo4j.pagerank(G, nstart=scores, max_iter=1)
+    assert set(warm) == set(scores)
+    personalized = nxneo4j.pagerank(G, personalization={"Ice": 1})
+    assert personalized["Ice"] > personalized["Strawberry"]
+    batch = nxneo4j.personalized_pagerank(G, [["Ice"], ["Strawberry"]])
+    assert batch[0]["Ice"] > batch[1]["Ice"]
+    assert all("nxneo4j-seed" not in k for _, d in G.nodes(data=True) for k in d)
+
+def test_numpy_output_mixed_identifiers():
+    G.clear()
+    G.add_edges_from([(1, "1"), ("1", 2.5)])
+    nodes, scores = nxneo4j.pagerank(G, output="numpy")
+    assert dict(zip(nodes.tolist(), scores.tolist())) == pytest.approx(nxneo4j.pagerank(G))
+
+def test_personalized_pagerank_projection():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    operations = []
+    G.instrument(operations.append)
+    try:
+        nxneo4j.personalized_pagerank(G, [["Ice"], ["Strawberry"], ["Sugar"]])
+        with G.projection():
+            nxneo4j.pagerank(G)
+            nxneo4j.personalized_pagerank(G, [["Ice"], ["Strawberry"]])
+    finally:
+        G.uninstrument(operations.append)
+    assert [o.name for o in operations] == [
+        "personalized_pagerank", "load", "pagerank", "personalized_pagerank", "unload"
+    ]
+    # One projection for all seed sets, and none at all inside a projection.
+    assert [o.queries for o in operations] == [3, 1, 1, 1, 1]
+
+def test_write_property():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")])
+    scores = nxneo4j.pagerank(G)
+    summary = nxneo4j.pagerank(G, write_property="pagerank")
+    assert summary["nodes"] == 4
+    stored = dict(G.nodes(data="pagerank"))
+    assert stored == pytest.approx(scores)
+    nxneo4j.triangles(G, write_property="triangles")
+    nxneo4j.clustering(G, write_property="clustering", triangles_property="triangleCount")
+    nxneo4j.betweenness_centrality(G, k=2, write_property="betweenness")
+    nodes = dict(G.nodes(data=True))
+    assert set(nodes["Sugar"]) == {"pagerank", "triangles", "clustering", "triangleCount", "betweenness"}
+    assert nodes["Sugar"]["triangleCount"] == nodes["Sugar"]["triangles"] == 0
+
+def test_component_membership():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Ice", "Cream")])
+    assert nxneo4j.number_connected_components(G) == 2
+    assert sorted(nxneo4j.connected_component_sizes(G).values()) == [2, 3]
+    membership = dict(nxneo4j.connected_components(G, output="pairs"))
+    assert membership["Strawberry"] == membership["Water"] != membership["Ice"]
+    assert sorted(map(len, nxneo4j.connected_components(G))) == [2, 3]
+
+def test_snapshot(tmpdir):
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Ice")], weight=2)
+    snapshot = G.snapshot(weight="weight")
+    assert sorted(snapshot) == sorted(G)
+    assert len(snapshot.edges) == len(G.edges)
+    assert sorted(snapshot.neighbors("Sugar")) == sorted(G.neighbors("Sugar"))
+    assert dict(snapshot.degree) == dict(G.degree)
+    assert snapshot.degree("Sugar", weight="weight") == 4
+
+    snapshot.save(str(tmpdir))
+    loaded = nxneo4j.snapshot.Snapshot.load(str(tmpdir))
+    assert loaded["Water"] == {"Sugar": {"weight": 2.0}, "Ice": {"weight": 2.0}}
+
+def test_local_backend():
+    G.clear()
+    G.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water"), ("Water", "Strawberry"), ("Ice", "Cream")])
+    assert nxneo4j.triangles(G, backend="local") == nxneo4j.triangles(G)
+    assert nxneo4j.number_connected_components(G, backend="local") == 2
+    local = nxneo4j.pagerank(G, backend="local")
+    assert local == pytest.approx(nxneo4j.pagerank(G), rel=1e-3)
+    assert nxneo4j.closeness_centrality(G, backend="local") == pytest.approx(nxneo4j.closeness_centrality(G))
+    sampled = nxneo4j.betweenness_centrality(G, k=2, seed=1, backend="local")
+    assert nxneo4j.betweenness_centrality(G, k=2, seed=1, backend="local") == sampled
+
+def test_networkx_conversion():
+    G.clear()
+    H = nx.Graph()
+    H.add_node("Strawberry", color="red")
+    H.add_edge("Strawberry", "Sugar", weight=2)
+    nxneo4j.from_networkx(H, G)
+    K = nxneo4j.to_networkx(G)
+    assert dict(K.nodes(data=True)) == dict(H.nodes(data=True))
+    assert list(K.edges(data="weight")) == [("Strawberry", "Sugar", 2)]
+    K = nxneo4j.to_networkx(G, node_attributes=False, edge_attributes=["weight"])
+    assert K.nodes["Strawberry"] == {}
+
+def test_sync():
+    G.clear()
+    H = nx.Graph()
+    H.add_node("Strawberry", color="red")
+    H.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water")], weight=1)
+    G.sync(H)
+    H.nodes["Strawberry"]["color"] = "green"
+    H.remove_node("Water")
+    H.add_edge("Sugar", "Cream", weight=2)
+    H["Strawberry"]["Sugar"]["weight"] = 3
+    assert G.sync(H) == {
+        "edges_removed": 1, "nodes_removed": 1, "nodes_added": 1,
+        "nodes_changed": 1, "edges_added": 1, "edges_changed": 1
+    }
+    assert G.nodes["Strawberry"]["color"] == "green"
+    assert sorted(G.nodes) == ["Cream", "Strawberry", "Sugar"]
+    assert nx.to_dict_of_dicts(nxneo4j.to_networkx(G)) == nx.to_dict_of_dicts(H)
+    assert not any(G.sync(H).values())
+    # Values come back from the database as lists and Python numbers.
+    H.nodes["Sugar"]["sweetness"] = (1, 2)
+    H["Sugar"]["Cream"]["weight"] = np.float64(1.5)
+    G.sync(H)
+    assert not any(G.sync(H).values())
+    # A relationship stored in both directions is one edge of a Graph.
+    G.add_edge("Cream", "Sugar")
+    assert G.sync(H)["edges_removed"] == 1
+    assert len(G.edges) == 2
+
+def test_id_cache():
+    C = nxneo4j.Graph(driver, dict(config, id_cache_size=100))
+    C.clear()
+    C.add_nodes_from(["Strawberry", "Sugar"])
+    C.add_edges_from([("Strawberry", "Sugar"), ("Sugar", "Water")])
+    assert len(C._ids) == 3
+    G.remove_node("Sugar")
+    C.add_edge("Strawberry", "Sugar")
+    assert sorted(C.edges) == [("Strawberry", "Sugar")]
+    C.remove_node("Strawberry")
+    C.add_edge("Strawberry", "Water")
+    assert sorted(C.nodes) == ["Strawberry", "Sugar", "Water"]
+    C.clear()
+    assert len(C._ids) == 0
+
+def test_load_edges():
+    G.clear()
+    G.ensure_schema()
+    edges = [("Fruit %d" % i, "Fruit %d" % (i + 1)) for i in range(50)]
+    progress = []
+    stats = G.load_edges(edges, workers=2, batch_size=3, window=10,
+                         progress=lambda written, stats: progress.append(written))
+    assert len(G.edges) == 50
+    assert progress[-1] == sum(batch["size"] for batch in stats) == 50
+    assert sum(batch["relationships_created"] for batch in stats) == 50
+    G.clear()
+    edges = [("Fruit %d" % i, "Fruit %d" % (i + 1), {"origin": {"country": "Spain"}} if i == 30 else {})
+             for i in range(50)]
+    progress = []
+    with pytest.raises(CypherTypeError):
+        G.load_edges(edges, workers=2, batch_size=3, window=10,
+                     progress=lambda written, stats: progress.append(written))
+    assert 0 < len(G.edges) == progress[-1] < 50
+
+def test_instrument():
+    G.clear()
+    operations = []
+    G.instrument(operations.append)
+    try:
+        G.add_nodes_from(["Strawberry", "Blackberry"])
+        assert len(G) == 2
+    finally:
+        G.uninstrument(operations.append)
+    assert [o.name for o in operations] == ["add_nodes_from", "NodeView.__len__"]
+    assert operations[0].counters["nodes_created"] == 2
+    assert operations[1].rows == 1
+    # Failing listeners are logged, unconsumed generators finish when
+    # they are garbage collected.
+    def fail(operation):
+        raise RuntimeError(operation.name)
+    operations = []
+    G.instrument(fail)
+    G.instrument(operations.append)
+    try:
+        nodes = G.nodes(data=True)
+        del nodes
+        assert len(G) == 2
+    finally:
+        G.uninstrument(operations.append)
+        G.uninstrument(fail)
+    assert [o.name for o in operations] == ["NodeView.__call__", "NodeView.__len__"]
+
 """
 G.add_node("Banana", {
     "shape": "curved",